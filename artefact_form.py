@@ -1,10 +1,14 @@
 from PyQt5.QtWidgets import (
     QDialog, QLineEdit, QLabel, QPushButton, QFormLayout,
     QTextEdit, QComboBox, QFileDialog, QVBoxLayout,
-    QListWidget, QListWidgetItem
+    QListWidget, QListWidgetItem, QMessageBox, QCheckBox, QHBoxLayout
 )
 from PyQt5.QtGui import QPixmap, QIcon
-from database import CATEGORIES, STATUS_OPTIONS, get_images, artefact_code_exists, artefact_code_exists_for_other
+from PyQt5.QtCore import Qt
+from database import (
+    CATEGORIES, STATUS_OPTIONS, Artefact, get_images_with_names, get_thumbnail,
+    artefact_code_exists, artefact_code_exists_for_other
+)
 
 
 class ArtefactForm(QDialog):
@@ -73,46 +77,46 @@ class ArtefactForm(QDialog):
 
         # If editing → populate fields
         if artefact:
-            # artefact tuple:
-            # (id, code, name, category, origin, description,
-            #  period, location, condition, status, curator, date_added)
-            self.code_input.setText(artefact[1])
-            self.name_input.setText(artefact[2])
-            self.category_input.setCurrentText(artefact[3])
-            self.origin_input.setText(artefact[4])
-            self.description_input.setPlainText(artefact[5])
-            self.period_input.setText(artefact[6])
-            self.location_input.setText(artefact[7])
-            self.condition_input.setCurrentText(artefact[8])
-            self.status_input.setCurrentText(artefact[9])
-            self.curator_input.setText(artefact[10])
-
-            # Load stored images (absolute paths from get_images)
-            for img_path in get_images(artefact[0]):
-                item = QListWidgetItem(img_path)   # ✅ keep absolute path
-                icon = QIcon(QPixmap(img_path).scaled(64, 64))
+            # artefact is a database.Artefact record
+            self.code_input.setText(artefact.artefact_code)
+            self.name_input.setText(artefact.name)
+            self.category_input.setCurrentText(artefact.category)
+            self.origin_input.setText(artefact.origin)
+            self.description_input.setPlainText(artefact.description)
+            self.period_input.setText(artefact.period)
+            self.location_input.setText(artefact.location)
+            self.condition_input.setCurrentText(artefact.condition)
+            self.status_input.setCurrentText(artefact.status)
+            self.curator_input.setText(artefact.curator)
+
+            # Load stored images: show the code-based name, keep the absolute path
+            for img_path, display_name in get_images_with_names(artefact.id):
+                item = QListWidgetItem(display_name)
+                item.setData(Qt.UserRole, img_path)
+                icon = QIcon(QPixmap(get_thumbnail(img_path, 64)).scaled(64, 64))
                 item.setIcon(icon)
                 self.image_list.addItem(item)
 
 
     def get_data(self):
         """
-        Return tuple of artefact data + list of image paths selected in form.
+        Return (Artefact with the entered fields, list of image paths selected in form).
         """
-        images = [self.image_list.item(i).text() for i in range(self.image_list.count())]
-        return (
-            self.code_input.text(),        # 🆕 custom code entered manually
-            self.name_input.text(),
-            self.category_input.currentText(),
-            self.origin_input.text(),
-            self.description_input.toPlainText(),
-            self.period_input.text(),
-            self.location_input.text(),
-            self.condition_input.currentText(),
-            self.status_input.currentText(),
-            self.curator_input.text(),
-            images
+        images = [self.image_list.item(i).data(Qt.UserRole) for i in range(self.image_list.count())]
+        artefact = Artefact(
+            id=self.artefact.id if self.artefact else None,
+            artefact_code=self.code_input.text(),        # 🆕 custom code entered manually
+            name=self.name_input.text(),
+            category=self.category_input.currentText(),
+            origin=self.origin_input.text(),
+            description=self.description_input.toPlainText(),
+            period=self.period_input.text(),
+            location=self.location_input.text(),
+            condition=self.condition_input.currentText(),
+            status=self.status_input.currentText(),
+            curator=self.curator_input.text(),
         )
+        return artefact, images
 
     def select_images(self):
         """
@@ -123,6 +127,7 @@ class ArtefactForm(QDialog):
         )
         for file_path in file_paths:
             item = QListWidgetItem(file_path)
+            item.setData(Qt.UserRole, file_path)
             icon = QIcon(QPixmap(file_path).scaled(64, 64))
             item.setIcon(icon)
             self.image_list.addItem(item)
@@ -140,7 +145,7 @@ class ArtefactForm(QDialog):
                 return
         else:
             # Editing existing
-            artefact_id = self.artefact[0]
+            artefact_id = self.artefact.id
             if artefact_code_exists_for_other(code, artefact_id):
                 QMessageBox.warning(self, "შეცდომა", f"კოდი '{code}' უკვე არსებობს სხვა არტეფაქტში.")
                 return
@@ -156,3 +161,55 @@ class ArtefactForm(QDialog):
             self.image_list.takeItem(row)
 
 
+class BulkEditDialog(QDialog):
+    """
+    Set status / location / curator on several artefacts at once. Only the
+    ticked fields are changed.
+    """
+
+    def __init__(self, count):
+        super().__init__()
+        self.setWindowTitle("ჯგუფური რედაქტირება")
+        self.setMinimumWidth(400)
+
+        layout = QFormLayout()
+        layout.addRow(QLabel(f"არჩეულია {count} არტეფაქტი"))
+
+        self.status_input = QComboBox()
+        self.status_input.addItems(STATUS_OPTIONS)
+        self.location_input = QLineEdit()
+        self.curator_input = QLineEdit()
+
+        # column -> (checkbox, widget value getter)
+        self.fields = {}
+        for column, label, widget, value in (
+            ("status", "სტატუსი:", self.status_input, self.status_input.currentText),
+            ("location", "მდებარეობა გამოფენაზე:", self.location_input, self.location_input.text),
+            ("curator", "კურატორი:", self.curator_input, self.curator_input.text),
+        ):
+            checkbox = QCheckBox(label)
+            widget.setEnabled(False)
+            checkbox.toggled.connect(widget.setEnabled)
+            layout.addRow(checkbox, widget)
+            self.fields[column] = (checkbox, value)
+
+        self.save_button = QPushButton("შენახვა")
+        self.cancel_button = QPushButton("გაუქმება")
+        self.save_button.clicked.connect(self.validate_and_accept)
+        self.cancel_button.clicked.connect(self.reject)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.save_button)
+        buttons.addWidget(self.cancel_button)
+        layout.addRow(buttons)
+
+        self.setLayout(layout)
+
+    def get_changes(self):
+        """{column: new value} for the ticked fields."""
+        return {column: value() for column, (checkbox, value) in self.fields.items() if checkbox.isChecked()}
+
+    def validate_and_accept(self):
+        if not self.get_changes():
+            QMessageBox.warning(self, "გაფრთხილება", "მონიშნეთ მინიმუმ ერთი ველი.")
+            return
+        self.accept()
@@ -0,0 +1,460 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QApplication
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QRect, QObject, QRunnable, QThreadPool, pyqtSignal
+)
+from PyQt5.QtGui import QPixmap, QPixmapCache, QImage, QImageReader
+from array import array
+import database
+
+# Column holding the photo preview (after the 12 artefact fields)
+PHOTO_COLUMN = 12
+COLUMN_COUNT = 13
+
+# Custom role: absolute path of the row's first photo (or None)
+IMAGE_PATH_ROLE = Qt.UserRole + 1
+
+THUMB_SIZE = 150
+ROW_HEIGHT = 160
+PLACEHOLDER = "assets/placeholder.png"
+
+# Keep at most ~700 decoded 150px previews around, whatever the collection size
+QPixmapCache.setCacheLimit(64 * 1024)
+
+
+# Artefact fields shown in columns 0..PHOTO_COLUMN-1
+MODEL_COLUMNS = database.ARTEFACT_COLUMNS[:PHOTO_COLUMN]
+
+
+class ArtefactColumns:
+    """
+    Column-oriented store for the rows a model has fetched, with no object
+    per row: ids live in an array('q'), columns with few distinct values
+    (category, status, ...) are dictionary-encoded as array('I') codes into
+    one shared copy of each value, and free-text columns are plain lists.
+    """
+
+    # Repetitive columns worth dictionary-encoding
+    DICTIONARY_COLUMNS = frozenset({
+        "category", "origin", "period", "location", "condition", "status", "curator", "date_added",
+    })
+
+    def __init__(self, columns=MODEL_COLUMNS):
+        self.columns = tuple(columns)
+        self._data = []
+        self._dictionaries = []
+        for column in self.columns:
+            if column == "id":
+                self._data.append(array("q"))
+                self._dictionaries.append(None)
+            elif column in self.DICTIONARY_COLUMNS:
+                self._data.append(array("I"))
+                self._dictionaries.append(([], {}))   # values, value -> code
+            else:
+                self._data.append([])
+                self._dictionaries.append(None)
+        self._id_column = self.columns.index("id")
+
+    def __len__(self):
+        return len(self._data[self._id_column])
+
+    def id(self, row):
+        return self._data[self._id_column][row]
+
+    def value(self, row, column):
+        """Value at (row, column index)."""
+        stored = self._data[column][row]
+        dictionary = self._dictionaries[column]
+        return stored if dictionary is None else dictionary[0][stored]
+
+    def _encode(self, column, value):
+        dictionary = self._dictionaries[column]
+        if dictionary is None:
+            return value
+        values, codes = dictionary
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def extend(self, records):
+        for column, name in enumerate(self.columns):
+            self._data[column].extend(self._encode(column, getattr(r, name)) for r in records)
+
+    def insert(self, row, record):
+        for column, name in enumerate(self.columns):
+            self._data[column].insert(row, self._encode(column, getattr(record, name)))
+
+    def replace(self, row, record):
+        for column, name in enumerate(self.columns):
+            self._data[column][row] = self._encode(column, getattr(record, name))
+
+    def delete(self, row):
+        for data in self._data:
+            del data[row]
+
+
+def _sort_value(value):
+    # SQLite orders NULL < numbers < text < blobs; Python can't compare across types
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, value)
+
+
+class ArtefactTableModel(QAbstractTableModel):
+    """
+    Read-only model over a list of matching artefact ids. The ids of the
+    whole result are known up front (see query_engine), in the order the
+    query sorted them, but their rows are pulled from the DB a page at a
+    time as the view scrolls (canFetchMore/fetchMore), so a huge result only
+    reads the first screenful. Fetched rows are kept in an ArtefactColumns
+    store; the table can be sorted by any of MODEL_COLUMNS.
+    """
+
+    PAGE_SIZE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = ArtefactColumns()   # fetched rows, for self._ids[:len(self._rows)]
+        self._ids = array("q")           # every matching artefact id, in sort order
+        self._images = {}
+        self._headers = []
+        self._query = ("", None, None, "id", False)
+        self._sort_index = 0
+
+    # ---------------- Query ----------------
+    def set_query(self, text="", category=None, status=None, sort="id", descending=False):
+        """Show the artefacts matching the given filters (all of them by default)."""
+        ids = database.search_ids(text, category, status, sort=sort, descending=descending)
+        self.set_result((text, category, status, sort, descending), ids)
+
+    def set_result(self, query, ids):
+        """Show ids, the result of query = (text, category, status, sort, descending)."""
+        self.beginResetModel()
+        self._rows = ArtefactColumns()
+        self._ids = array("q", ids)
+        self._images = {}
+        self._query = query
+        self._sort_index = MODEL_COLUMNS.index(query[3])
+        self.endResetModel()
+        self.fetchMore()
+
+    def query(self):
+        return self._query
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self._rows) < len(self._ids)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        first = len(self._rows)
+        page = self._ids[first:first + self.PAGE_SIZE]
+        records = database.get_artefacts_by_ids(page)
+        if len(records) < len(page):
+            # Deleted since the query ran: drop them instead of leaving holes
+            found = {r.id for r in records}
+            self._ids[first:first + len(page)] = array("q", (i for i in page if i in found))
+        if not records:
+            return
+
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self._rows.extend(records)
+        self._images.update(database.get_first_image_map([r.id for r in records]))
+        self.endInsertRows()
+
+    def refresh_rows(self, artefact_ids):
+        """
+        Re-read just these artefacts and insert, update, move or remove their
+        rows (and drop their cached thumbnails) instead of resetting the model.
+        """
+        artefact_ids = set(artefact_ids)
+        if not artefact_ids:
+            return
+
+        text, category, status, sort, _ = self._query
+        current = {r.id: r for r in database.search_artefacts(text, category, status, ids=artefact_ids)}
+        images = database.get_first_image_map(current)
+
+        # Take every moved or removed row out first, then place the current
+        # records: _place positions a record among the rows left, which must
+        # all still be in sort order (a changed row not yet taken out would
+        # sit at its old position with a new sort value)
+        moved = []
+        for artefact_id in sorted(artefact_ids):
+            for path in (self._images.pop(artefact_id, None), images.get(artefact_id)):
+                if path:
+                    QPixmapCache.remove(_cache_key(path))
+            if artefact_id in images:
+                self._images[artefact_id] = images[artefact_id]
+
+            pos = self._find(artefact_id)
+            record = current.get(artefact_id)
+            if pos is not None:
+                if (record is not None and pos < len(self._rows)
+                        and self._record_key(record) == self._row_key(pos)):
+                    self._rows.replace(pos, record)
+                    self.dataChanged.emit(self.index(pos, 0), self.index(pos, COLUMN_COUNT - 1))
+                    continue
+                # Gone, or its sort value changed: take it out and re-insert below
+                self._take(pos)
+            if record is not None:
+                moved.append(record)
+
+        for record in moved:
+            self._place(record)
+
+    # ---------------- Sort order ----------------
+    def _row_key(self, row):
+        return (_sort_value(self._rows.value(row, self._sort_index)), self._rows.id(row))
+
+    def _record_key(self, record):
+        return (_sort_value(getattr(record, self._query[3])), record.id)
+
+    def _bisect(self, count, key_at, key):
+        """First of count positions whose key does not sort before key."""
+        descending = self._query[4]
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = key_at(mid)
+            if (other > key) if descending else (other < key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, artefact_id):
+        """Position of artefact_id in the result, or None."""
+        if self._sort_index == 0:
+            pos = self._bisect(len(self._ids), self._ids.__getitem__, artefact_id)
+            return pos if pos < len(self._ids) and self._ids[pos] == artefact_id else None
+        try:
+            return self._ids.index(artefact_id)
+        except ValueError:
+            return None
+
+    def _take(self, pos):
+        if pos < len(self._rows):
+            self.beginRemoveRows(QModelIndex(), pos, pos)
+            self._rows.delete(pos)
+            del self._ids[pos]
+            self.endRemoveRows()
+        else:
+            del self._ids[pos]
+
+    def _place(self, record):
+        """Insert record where the query's sort order puts it."""
+        artefact_id = record.id
+        loaded = len(self._rows)
+        if self._sort_index == 0:
+            pos = self._bisect(len(self._ids), self._ids.__getitem__, artefact_id)
+        else:
+            pos = self._bisect(loaded, self._row_key, self._record_key(record))
+            if pos == loaded and loaded < len(self._ids):
+                # Somewhere among the rows not fetched yet: ask the DB
+                _, _, _, sort, descending = self._query
+                pos += database.count_sorted_before(
+                    self._ids[loaded:], sort, descending, getattr(record, sort), artefact_id
+                )
+
+        if pos < loaded or loaded == len(self._ids):
+            self.beginInsertRows(QModelIndex(), pos, pos)
+            self._rows.insert(pos, record)
+            self._ids.insert(pos, artefact_id)
+            self.endInsertRows()
+        else:
+            # Past the last fetched page: fetchMore reads it later
+            self._ids.insert(pos, artefact_id)
+
+    # ---------------- Access ----------------
+    def artefact_id(self, row):
+        return self._rows.id(row)
+
+    def set_header_labels(self, labels):
+        self._headers = list(labels)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, COLUMN_COUNT - 1)
+
+    # ---------------- Qt model interface ----------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else COLUMN_COUNT
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+
+        if role == Qt.DisplayRole and column < PHOTO_COLUMN:
+            return str(self._rows.value(row, column))
+        if role == IMAGE_PATH_ROLE:
+            return self._images.get(self._rows.id(row))
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._headers):
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled  # read-only
+
+
+# ---------------- Thumbnail loading ----------------
+
+def _cache_key(path):
+    return f"thumb:{THUMB_SIZE}:{path}"
+
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class _ThumbnailTask(QRunnable):
+    """Decode one photo straight to preview size on a worker thread."""
+
+    def __init__(self, path, signals):
+        super().__init__()
+        self.setAutoDelete(False)  # ThumbnailLoader keeps the reference
+        self.path = path
+        self.signals = signals
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            return
+        # Prefer the precomputed 150px derivative over the 1600px master
+        reader = QImageReader(database.get_thumbnail(self.path, THUMB_SIZE))
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid():
+            # Downscale while decoding: JPEGs are read at reduced resolution
+            size.scale(THUMB_SIZE, THUMB_SIZE, Qt.KeepAspectRatio)
+            reader.setScaledSize(size)
+        image = reader.read()
+        if not self.cancelled:
+            self.signals.loaded.emit(self.path, image)
+
+
+class ThumbnailLoader(QObject):
+    """
+    Decodes previews on a QThreadPool and puts them in QPixmapCache.
+    Emits thumbnail_ready(path) on the GUI thread when one arrives.
+    """
+
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(2, QThreadPool.globalInstance().maxThreadCount() - 1))
+        self._signals = _ThumbnailSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+        self._pending = {}
+
+    def request(self, path):
+        """Queue path for decoding unless it is already on its way."""
+        if path in self._pending:
+            return
+        task = _ThumbnailTask(path, self._signals)
+        self._pending[path] = task
+        self._pool.start(task)
+
+    def retain(self, paths):
+        """Cancel every pending request whose path is not in paths."""
+        for path in [p for p in self._pending if p not in paths]:
+            task = self._pending.pop(path)
+            task.cancelled = True
+            self._pool.tryTake(task)
+
+    def _on_loaded(self, path, image):
+        if self._pending.pop(path, None) is None:
+            return  # cancelled while decoding
+        if image.isNull():
+            pixmap = ThumbnailDelegate.placeholder()  # unreadable/missing: don't retry
+        else:
+            pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(_cache_key(path), pixmap)
+        self.thumbnail_ready.emit(path)
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """
+    Paints the photo preview column. Qt only paints visible cells, so only
+    on-screen rows ever request a thumbnail. Until the background loader
+    delivers it, the placeholder is shown; requests for rows scrolled out
+    of view are cancelled.
+    """
+
+    def __init__(self, view):
+        """view must already have its model set."""
+        super().__init__(view)
+        self._view = view
+        self.loader = ThumbnailLoader(self)
+        self.loader.thumbnail_ready.connect(lambda _path: view.viewport().update())
+        view.verticalScrollBar().valueChanged.connect(self.cancel_offscreen)
+        view.model().modelReset.connect(lambda: self.loader.retain(set()))
+
+    def paint(self, painter, option, index):
+        # Background / selection highlight as for any other cell
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        pixmap = self.thumbnail(index.data(IMAGE_PATH_ROLE))
+        if pixmap.isNull():
+            return
+        size = pixmap.size()
+        if size.width() > option.rect.width() or size.height() > option.rect.height():
+            size.scale(option.rect.size(), Qt.KeepAspectRatio)  # fit narrow columns
+        target = QRect(option.rect.topLeft(), size)
+        target.moveCenter(option.rect.center())
+        painter.drawPixmap(target, pixmap)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setHeight(ROW_HEIGHT)
+        return size
+
+    def thumbnail(self, path):
+        """Return the cached preview for path, or the placeholder while it loads."""
+        if not path:
+            return self.placeholder()
+        pixmap = QPixmapCache.find(_cache_key(path))
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        self.loader.request(path)
+        return self.placeholder()
+
+    def cancel_offscreen(self):
+        """Drop pending thumbnail requests for rows no longer visible."""
+        view = self._view
+        first = view.rowAt(0)
+        last = view.rowAt(view.viewport().height() - 1)
+        if first < 0:
+            self.loader.retain(set())
+            return
+        if last < 0:
+            last = view.model().rowCount() - 1
+
+        model = view.model()
+        visible = {model.index(row, PHOTO_COLUMN).data(IMAGE_PATH_ROLE) for row in range(first, last + 1)}
+        self.loader.retain(visible)
+
+    @staticmethod
+    def placeholder():
+        key = _cache_key(PLACEHOLDER)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap(PLACEHOLDER)
+            if not pixmap.isNull():
+                pixmap = pixmap.scaled(THUMB_SIZE, THUMB_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                QPixmapCache.insert(key, pixmap)
+        return pixmap
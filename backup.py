@@ -1,7 +1,7 @@
 import os
 from pydrive2.auth import GoogleAuth
 from pydrive2.drive import GoogleDrive
-from database import DB_NAME, PHOTOS_DIR, DOCS_DIR
+from database import DB_NAME, PHOTOS_DIR, DOCS_DIR, checkpoint, close_connections, photo_path
 
 # -------------------------
 # Paths
@@ -105,7 +105,8 @@ def backup_database_and_photos():
     db_folder_id = get_or_create_folder(drive, DB_FOLDER, root_id)
     photos_folder_id = get_or_create_folder(drive, PHOTOS_FOLDER, root_id)
 
-    # Backup DB
+    # Backup DB (flush the WAL first so the main file is complete)
+    checkpoint()
     upload_file(drive, db_folder_id, DB_NAME)
 
     # Backup photos
@@ -132,6 +133,12 @@ def sync_from_drive(overwrite_all=True):
         files = drive.ListFile({"q": f"'{db_folder_id}' in parents and trashed=false"}).GetList()
         for f in files:
             if f["title"] == os.path.basename(DB_NAME):
+                # Close open connections and drop the old WAL so it isn't replayed
+                # over the restored file
+                close_connections()
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(DB_NAME + suffix):
+                        os.remove(DB_NAME + suffix)
                 local_path = DB_NAME
                 download_file(drive, f, local_path)
 
@@ -139,7 +146,7 @@ def sync_from_drive(overwrite_all=True):
     if photos_folder_id:
         files = drive.ListFile({"q": f"'{photos_folder_id}' in parents and trashed=false"}).GetList()
         for f in files:
-            local_path = os.path.join(PHOTOS_DIR, f["title"])
+            local_path = photo_path(f["title"])
             download_file(drive, f, local_path)
 
     print("✅ Full sync complete.")
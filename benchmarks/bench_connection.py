@@ -0,0 +1,69 @@
+"""
+Micro-benchmark: a fresh sqlite3.connect per lookup (the old pattern)
+versus the shared per-thread connection from database.get_connection().
+
+Runs against a scratch collection, never the real C:\\GEM DATABASE:
+
+    python benchmarks/bench_connection.py --lookups 10000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEM_DATA_DIR", tempfile.mkdtemp(prefix="gem_bench_"))
+
+import database  # noqa: E402  (must follow GEM_DATA_DIR)
+
+
+def code_exists_per_call(code):
+    """The pre-pooling implementation of artefact_code_exists."""
+    conn = sqlite3.connect(database.DB_NAME)
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM artefacts WHERE artefact_code=?", (code,))
+    exists = cur.fetchone()[0] > 0
+    conn.close()
+    return exists
+
+
+def seed(count):
+    with database.transaction() as cur:
+        cur.executemany(
+            "INSERT OR IGNORE INTO artefacts (artefact_code, name) VALUES (?, ?)",
+            ((f"B-{i:06d}", f"ნივთი {i}") for i in range(count)),
+        )
+
+
+def timed(fn, codes):
+    start = time.perf_counter()
+    for code in codes:
+        fn(code)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    database.init_db()
+    seed(args.rows)
+    codes = [f"B-{i % args.rows:06d}" for i in range(args.lookups)]
+
+    per_call = timed(code_exists_per_call, codes)
+    pooled = timed(database.artefact_code_exists, codes)
+
+    print(f"DB: {database.DB_NAME}")
+    print(f"{args.lookups} lookups, per-call connect : {per_call:.3f} s "
+          f"({per_call / args.lookups * 1e6:.1f} µs/lookup)")
+    print(f"{args.lookups} lookups, shared connection: {pooled:.3f} s "
+          f"({pooled / args.lookups * 1e6:.1f} µs/lookup)")
+    print(f"speed-up: {per_call / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: Excel export throughput (rows/s) and peak Python memory of
+exporter.export_to_excel on a synthetic collection.
+
+Runs against a scratch collection, never the real C:\\GEM DATABASE
+(run it from the repository root, where the exporter finds its fonts):
+
+    python benchmarks/bench_excel_export.py --rows 100000 [--trace-memory]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEM_DATA_DIR", tempfile.mkdtemp(prefix="gem_bench_"))
+
+import database  # noqa: E402  (must follow GEM_DATA_DIR)
+import exporter  # noqa: E402
+
+
+def seed(count):
+    categories, statuses = database.CATEGORIES, database.STATUS_OPTIONS
+    with database.transaction() as cur, database.deferred_search_index(cur):
+        cur.executemany(
+            """INSERT OR IGNORE INTO artefacts
+               (artefact_code, name, category, origin, description, period,
+                location, condition, status, curator)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((f"X-{i:06d}", f"ჭურჭელი {i}", categories[i % len(categories)], "გრაკლიანი გორა",
+              "თიხის ჭურჭლის ფრაგმენტი ორნამენტით", "ძვ.წ. IV ს", f"ვიტრინა {i % 40}",
+              "კარგი", statuses[i % len(statuses)], "ნინო")
+             for i in range(count)),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report peak memory (tracemalloc slows the export down)")
+    args = parser.parse_args()
+
+    database.init_db()
+    seed(args.rows)
+    count = database.get_connection().execute("SELECT COUNT(*) FROM artefacts").fetchone()[0]
+    out = os.path.join(os.environ["GEM_DATA_DIR"], "bench.xlsx")
+
+    if args.trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    exporter.export_to_excel(out)
+    elapsed = time.perf_counter() - start
+
+    print(f"DB: {database.DB_NAME} ({count} rows)")
+    print(f"export: {elapsed:.2f} s, {count / elapsed:,.0f} rows/s, "
+          f"file {os.path.getsize(out) / 1024 / 1024:.1f} MB")
+    if args.trace_memory:
+        print(f"peak Python memory: {tracemalloc.get_traced_memory()[1] / 1024 / 1024:.1f} MB")
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
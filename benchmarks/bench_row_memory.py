@@ -0,0 +1,90 @@
+"""
+Memory benchmark: bytes per 100k artefact rows held in memory as plain
+tuples (the old fetchall), as Artefact records, and in the table model's
+ArtefactColumns store.
+
+Runs against a scratch collection, never the real C:\\GEM DATABASE:
+
+    python benchmarks/bench_row_memory.py --rows 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEM_DATA_DIR", tempfile.mkdtemp(prefix="gem_bench_"))
+
+import database  # noqa: E402  (must follow GEM_DATA_DIR)
+from artefact_table import ArtefactColumns  # noqa: E402
+
+
+def seed(count):
+    categories, statuses = database.CATEGORIES, database.STATUS_OPTIONS
+    with database.transaction() as cur:
+        cur.executemany(
+            """INSERT OR IGNORE INTO artefacts
+               (artefact_code, name, category, origin, description, period,
+                location, condition, status, curator)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((f"M-{i:06d}", f"ჭურჭელი {i}", categories[i % len(categories)], "გრაკლიანი გორა",
+              f"აღწერა {i}: თიხის ჭურჭლის ფრაგმენტი", "ძვ.წ. IV ს", f"ვიტრინა {i % 40}",
+              "კარგი", statuses[i % len(statuses)], "ნინო")
+             for i in range(count)),
+        )
+
+
+def measure(build):
+    """Bytes still allocated by whatever build() returns (tracemalloc)."""
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def tuples():
+    return database.get_connection().execute("SELECT * FROM artefacts").fetchall()
+
+
+def records():
+    return list(database.iter_artefacts())
+
+
+def columns():
+    store = ArtefactColumns()
+    page = []
+    for record in database.iter_artefacts():
+        page.append(record)
+        if len(page) == database.LIST_PAGE_SIZE:
+            store.extend(page)
+            page = []
+    store.extend(page)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    database.init_db()
+    seed(args.rows)
+    count = database.get_connection().execute("SELECT COUNT(*) FROM artefacts").fetchone()[0]
+    scale = 100000 / count
+
+    print(f"DB: {database.DB_NAME} ({count} rows)")
+    for label, build in (("tuples (fetchall)", tuples), ("Artefact records", records),
+                         ("ArtefactColumns", columns)):
+        size = measure(build)
+        print(f"{label:<18}: {size * scale / 1024 / 1024:7.1f} MB per 100k rows "
+              f"({size / count:.0f} B/row)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Benchmark suite: times the main read, search, photo, export and UI paths
+on synthetic collections of growing size and writes the results to JSON.
+
+Each scale grows one scratch collection with benchmarks/synthetic.py
+(never the real C:\\GEM DATABASE), then times get_artefacts, the searches
+behind apply_filters, add_image, export_to_excel / export_to_pdf (cold and
+from the export cache) and MainWindow.load_data on an offscreen Qt window.
+Run it from the repository root, where the exporter finds its fonts:
+
+    python benchmarks/bench_suite.py --scales 1000,10000,100000 --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Searches timed at every scale: (name, search_ids kwargs)
+SEARCHES = (
+    ("search_short_text", {"text": "ქვ"}),                  # under TRIGRAM_MIN_CHARS: term lookup
+    ("search_text", {"text": "ორნამენტით"}),                # trigram index
+    ("search_category", {"category": "კერამიკა"}),
+    ("search_status_text", {"status": "გამოფენილი", "text": "ბრინჯაოს"}),
+    ("search_sorted", {"text": "თიხის", "sort": "name", "descending": True}),
+)
+
+# Photos attached per add_image run
+ADD_IMAGE_COUNT = 5
+
+
+def timed(fn, repeat):
+    """Run fn repeat times: {"median", "min", "runs"} in seconds, plus fn's last result."""
+    runs, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return {"median": statistics.median(runs), "min": min(runs), "runs": runs}, result
+
+
+def git_head():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_scale(scale, args, app):
+    import database
+    import exporter
+    import main
+    import synthetic
+
+    results = {}
+    start = time.perf_counter()
+    added, photos = synthetic.populate(scale, int(scale * args.photo_ratio), args.seed)
+    results["populate"] = {"seconds": time.perf_counter() - start, "artefacts_added": added,
+                           "photos_added": photos}
+    count = database.get_connection().execute("SELECT COUNT(*) FROM artefacts").fetchone()[0]
+
+    results["get_artefacts"], rows = timed(lambda: sum(1 for _ in database.get_artefacts()), args.repeat)
+    results["get_artefacts"]["rows"] = rows
+
+    for name, query in SEARCHES:
+        results[name], ids = timed(lambda: database.search_ids(**query), args.repeat)
+        results[name]["matches"] = len(ids)
+
+    # add_image: fresh photos every run, so content-hash dedup never kicks in
+    # (attached to a throwaway artefact, deleted afterwards)
+    incoming = tempfile.mkdtemp(prefix="gem_bench_photos_")
+    artefact_id = database.add_artefact(
+        ("BENCH-ADD-IMAGE", "ბენჩმარკი", database.CATEGORIES[0]) + ("",) * 7
+    )
+    try:
+        sources = iter([synthetic.make_jpeg(os.path.join(incoming, f"{i}.jpg"), f"add:{scale}:{i}")
+                        for i in range(ADD_IMAGE_COUNT * args.repeat)])
+
+        def add_images():
+            for _ in range(ADD_IMAGE_COUNT):
+                database.add_image(artefact_id, next(sources))
+
+        results["add_image"], _ = timed(add_images, args.repeat)
+        results["add_image"]["per_photo_median"] = results["add_image"]["median"] / ADD_IMAGE_COUNT
+    finally:
+        database.delete_artefact(artefact_id)
+        shutil.rmtree(incoming, ignore_errors=True)
+
+    out_dir = tempfile.mkdtemp(prefix="gem_bench_out_")
+    try:
+        for kind, export, limit in (("excel", exporter.export_to_excel, None),
+                                    ("pdf", exporter.export_to_pdf, args.pdf_max)):
+            if limit is not None and count > limit:
+                results[f"export_{kind}"] = {"skipped": f"{count} rows > --pdf-max {limit}"}
+                continue
+            out = os.path.join(out_dir, f"bench.{'xlsx' if kind == 'excel' else kind}")
+
+            def cold():
+                shutil.rmtree(database.EXPORT_CACHE_DIR, ignore_errors=True)
+                export(out)
+
+            results[f"export_{kind}"], _ = timed(cold, args.repeat)
+            results[f"export_{kind}"]["file_mb"] = os.path.getsize(out) / 1024 / 1024
+            results[f"export_{kind}_cached"], _ = timed(lambda: export(out), args.repeat)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    start = time.perf_counter()
+    window = main.MainWindow("admin", "admin")
+    app.processEvents()
+    results["main_window"] = {"seconds": time.perf_counter() - start}
+
+    def load_data():
+        window.load_data()
+        app.processEvents()
+
+    results["load_data"], _ = timed(load_data, args.repeat)
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+    return results
+
+
+def compare(results, baseline_path):
+    """Print median ratios against an earlier results file (< 1: faster now)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"\nvs {baseline_path} (new / old median):")
+    for scale, benches in results.items():
+        old_benches = baseline.get(scale, {})
+        for name, result in benches.items():
+            old = old_benches.get(name, {})
+            if "median" in result and old.get("median"):
+                print(f"  {scale:>7} {name:<22} {result['median'] / old['median']:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", help="scratch collection folder (default: a new temp folder)")
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="comma-separated artefact counts, run in increasing order")
+    parser.add_argument("--photo-ratio", type=float, default=0.01, help="photos per artefact")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing (the median is reported)")
+    parser.add_argument("--pdf-max", type=int, default=10000,
+                        help="skip the PDF export above this many artefacts (0: never skip)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="print ratios against an earlier run")
+    args = parser.parse_args()
+    args.pdf_max = args.pdf_max or None
+    scales = sorted(int(s) for s in args.scales.split(","))
+    args.output = os.path.abspath(args.output)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+
+    os.environ["GEM_DATA_DIR"] = args.data_dir or tempfile.mkdtemp(prefix="gem_bench_")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.chdir(REPO_DIR)  # fonts/ and assets/ are opened by relative path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from PyQt5.QtWidgets import QApplication
+    import database
+
+    app = QApplication(sys.argv)
+    database.init_db()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_head(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version,
+            "data_dir": database.DOCS_DIR,
+            "seed": args.seed,
+            "photo_ratio": args.photo_ratio,
+            "repeat": args.repeat,
+            "scales": scales,
+        },
+        "results": {},
+    }
+    for scale in scales:
+        print(f"--- {scale} artefacts")
+        results = bench_scale(scale, args, app)
+        report["results"][str(scale)] = results
+        for name, result in results.items():
+            if "median" in result:
+                print(f"  {name:<22} {result['median'] * 1000:10.1f} ms")
+            elif "seconds" in result:
+                print(f"  {name:<22} {result['seconds'] * 1000:10.1f} ms")
+            else:
+                print(f"  {name:<22} {result['skipped']}")
+        # Written after every scale, so an interrupted 100k run keeps the rest
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ Results written to {args.output}")
+    if args.compare:
+        compare(report["results"], args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Synthetic collection generator: fills a scratch collection with N
+artefacts (Georgian names, descriptions and places; categories from
+CATEGORIES, statuses from STATUS_OPTIONS) and M generated JPEGs stored
+through the normal photo pipeline (masters + thumbnails).
+
+The same --seed always gives the same artefacts, and running it again
+with larger numbers only adds what is missing, so one scratch folder can
+grow from 1k to 100k artefacts. Never point it at the real C:\\GEM DATABASE:
+
+    python benchmarks/synthetic.py --data-dir D:\\gem_bench --artefacts 10000 --photos 500
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Codes of generated artefacts: CODE_PREFIX + 7-digit index
+CODE_PREFIX = "SYN-"
+
+# Size of the generated source photos (stored at imaging.MASTER_SIZE)
+PHOTO_SIZE = (2000, 1500)
+
+OBJECTS = [
+    "ქვევრი", "დოქი", "ჯამი", "სასმისი", "ბეჭედი", "საყურე", "სამაჯური", "ფიბულა",
+    "ისრისპირი", "შუბისპირი", "ხანჯალი", "ცული", "მონეტა", "საბეჭდავი", "ლამპარი",
+    "კოჭობი", "თასი", "ქოთანი", "ზარდახშა", "ჯვარი", "ხატი", "ქანდაკება", "ფილა", "ამფორა",
+]
+MATERIALS = ["თიხის", "ბრინჯაოს", "ვერცხლის", "ოქროს", "რკინის", "მინის", "ქვის", "ძვლის", "ხის"]
+PLACES = [
+    "მცხეთა", "ვანი", "ურბნისი", "გრაკლიანი გორა", "ნოქალაქევი", "დმანისი", "ბორჯომი",
+    "ფიჭვნარი", "სამთავრო", "არმაზისხევი", "უფლისციხე", "ვარძია", "ნიქოზი", "ციხიაგორა",
+    "ბიჭვინთა", "ვაშლოვანი", "ალაზნის ველი", "თრიალეთი",
+]
+PERIODS = [
+    "ძვ.წ. III ათასწლეული", "ბრინჯაოს ხანა", "ადრერკინის ხანა", "ძვ.წ. VI ს", "ძვ.წ. IV ს",
+    "ძვ.წ. I ს", "ახ.წ. I ს", "ახ.წ. III ს", "ახ.წ. VI ს", "X-XI სს", "XII-XIII სს", "XVIII ს",
+]
+CONDITIONS = ["კარგი", "დამაკმაყოფილებელი", "დაზიანებული", "ფრაგმენტული", "რესტავრირებული"]
+CURATORS = ["ნინო ბერიძე", "გიორგი კაპანაძე", "თამარ ლომიძე", "დავით ჯაფარიძე", "მარიამ ცერცვაძე"]
+LOCATIONS = ["საცავი", "ვიტრინა", "დარბაზი", "სარესტავრაციო ლაბორატორია"]
+WORDS = [
+    "ორნამენტით", "შემკული", "ზედაპირი", "გაპრიალებული", "ყური", "ძირი", "პირი", "ყელი",
+    "მოხატული", "წითლად", "შავად", "გამომწვარი", "ნაწილობრივ", "შემორჩენილი", "ნაპრალი",
+    "აღმოჩენილია", "სამარხში", "ნამოსახლარზე", "გათხრების", "დროს", "ტიპის", "ნიმუში",
+    "გეომეტრიული", "სახეებით", "მცენარეული", "ცხოველის", "გამოსახულებით", "წარწერით",
+    "ბერძნული", "ქართული", "ასომთავრული", "ადგილობრივი", "იმპორტული", "სახელოსნოს",
+]
+
+
+def _artefact(index, seed, categories, statuses):
+    """Field values of generated artefact `index` (the same for a given seed)."""
+    rnd = random.Random(f"{seed}:{index}")
+    name = f"{rnd.choice(MATERIALS)} {rnd.choice(OBJECTS)}"
+    description = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 40)))
+    return (
+        f"{CODE_PREFIX}{index:07d}",
+        name,
+        rnd.choice(categories),
+        rnd.choice(PLACES),
+        f"{name}, {description}.",
+        rnd.choice(PERIODS),
+        f"{rnd.choice(LOCATIONS)} {rnd.randint(1, 40)}",
+        rnd.choice(CONDITIONS),
+        rnd.choice(statuses),
+        rnd.choice(CURATORS),
+        f"{rnd.randint(2005, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+    )
+
+
+def make_jpeg(path, seed):
+    """Write a distinct photo-like JPEG (colour fields and shapes) to path."""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rnd = random.Random(f"photo:{seed}")
+    img = Image.new("RGB", PHOTO_SIZE, tuple(rnd.randrange(60, 200) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    width, height = PHOTO_SIZE
+    for _ in range(80):
+        x, y = rnd.randrange(width), rnd.randrange(height)
+        size = rnd.randrange(30, 400)
+        colour = tuple(rnd.randrange(256) for _ in range(3))
+        if rnd.random() < 0.5:
+            draw.ellipse((x, y, x + size, y + size * 3 // 4), fill=colour)
+        else:
+            draw.rectangle((x, y, x + size, y + size // 2), fill=colour)
+    img = img.filter(ImageFilter.GaussianBlur(2))  # camera-like softness, realistic JPEG sizes
+    img.save(path, "JPEG", quality=90)
+    return path
+
+
+def populate(artefacts, photos=0, seed=1, progress=None):
+    """
+    Grow the collection to `artefacts` generated artefacts and `photos`
+    generated photos (spread evenly over them). Returns the numbers added.
+    progress(stage, done, total) reports "artefacts" and then "photos".
+    """
+    import database
+
+    conn = database.get_connection()
+    existing = conn.execute(
+        "SELECT COUNT(*) FROM artefacts WHERE artefact_code LIKE ?", (CODE_PREFIX + "%",)
+    ).fetchone()[0]
+    added = 0
+    if artefacts > existing:
+        with database.transaction() as cur, database.deferred_search_index(cur):
+            cur.executemany(
+                """INSERT OR IGNORE INTO artefacts
+                   (artefact_code, name, category, origin, description, period,
+                    location, condition, status, curator, date_added)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (_artefact(i, seed, database.CATEGORIES, database.STATUS_OPTIONS)
+                 for i in range(existing, artefacts)),
+            )
+            added = cur.rowcount
+        if progress:
+            progress("artefacts", artefacts, artefacts)
+
+    linked = conn.execute(
+        "SELECT COUNT(*) FROM artefact_images i JOIN artefacts a ON a.id = i.artefact_id "
+        "WHERE a.artefact_code LIKE ?", (CODE_PREFIX + "%",)
+    ).fetchone()[0]
+    photos = min(photos, artefacts)
+    if photos <= linked:
+        return added, 0
+
+    # Spread the new photos over the collection as it is now
+    step = artefacts // photos
+    codes = [f"{CODE_PREFIX}{k * step:07d}" for k in range(linked, photos)]
+    ids = dict(conn.execute(
+        "SELECT artefact_code, id FROM artefacts WHERE artefact_code IN (SELECT value FROM json_each(?))",
+        (json.dumps(codes),),
+    ))
+
+    incoming = tempfile.mkdtemp(prefix="gem_synthetic_")
+    try:
+        sources = []
+        for k, code in enumerate(codes, start=linked):
+            sources.append(make_jpeg(os.path.join(incoming, f"{code}.jpg"), f"{seed}:{k}"))
+            if progress:
+                progress("photos", k - linked + 1, 2 * len(codes))
+        report = (lambda done, total: progress("photos", len(codes) + done, 2 * len(codes))) if progress else None
+        stored = database.ingest_photos(sources, progress=report)
+        with database.transaction():
+            for code, (filename, content_hash) in zip(codes, stored):
+                database.link_image(ids[code], filename, content_hash)
+    finally:
+        shutil.rmtree(incoming, ignore_errors=True)
+    return added, len(codes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", required=True, help="scratch collection folder (GEM_DATA_DIR)")
+    parser.add_argument("--artefacts", type=int, default=10000)
+    parser.add_argument("--photos", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["GEM_DATA_DIR"] = args.data_dir
+    import database
+    database.init_db()
+
+    def progress(stage, done, total):
+        print(f"\r{stage}: {done}/{total}", end="", flush=True)
+
+    added, photos = populate(args.artefacts, args.photos, args.seed, progress=progress)
+    print(f"\n✅ {added} artefacts and {photos} photos added to {database.DOCS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
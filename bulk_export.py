@@ -0,0 +1,146 @@
+import csv
+import json
+import os
+
+from database import ARTEFACT_COLUMNS, iter_artefacts, get_images_for
+
+# -------------------------
+# Bulk export
+# -------------------------
+# Machine-readable dumps of the catalogue for analysis and the website:
+# CSV, NDJSON and Parquet with the raw column values (no formatting).
+# Rows are streamed from iter_artefacts in batches of BATCH_SIZE, so memory
+# stays flat however large the collection. With photos=True each row also
+# gets a "photos" column: its photo paths in display order.
+# The CSV uses the column names as headers, so import_artefacts reads it back.
+
+# Rows per batch (and per Parquet row group)
+BATCH_SIZE = 10000
+
+# Output buffer: fewer, larger writes
+WRITE_BUFFER = 1 << 20
+
+# Separator of the photo paths in a CSV cell
+CSV_PHOTO_SEPARATOR = ";"
+
+# Low-cardinality columns stored dictionary-encoded in Parquet
+DICTIONARY_COLUMNS = ("category", "status", "curator")
+
+
+def _batches(photos, text, category, status, sort, descending, as_json=False):
+    """
+    Lists of ARTEFACT_COLUMNS tuples, plus a list of photo paths if photos.
+    as_json (without photos) yields lists of JSON object strings instead.
+    """
+    rows = iter_artefacts(columns=ARTEFACT_COLUMNS, sort=sort, descending=descending,
+                          text=text, category=category, status=status,
+                          page_size=BATCH_SIZE, as_json=as_json)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield _with_photos(batch) if photos else batch
+            batch = []
+    if batch:
+        yield _with_photos(batch) if photos else batch
+
+
+def _with_photos(batch):
+    images = get_images_for([row[0] for row in batch])
+    return [row + (images.get(row[0], []),) for row in batch]
+
+
+def _columns(photos):
+    return ARTEFACT_COLUMNS + ("photos",) if photos else ARTEFACT_COLUMNS
+
+
+def export_to_csv(filename, photos=False, text="", category=None, status=None,
+                  sort="id", descending=False):
+    """Write the matching artefacts as UTF-8 CSV. Returns the number of rows."""
+    count = 0
+    with open(filename, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        f.write("\ufeff")  # BOM for Excel; "utf-8-sig" would encode row by row in Python
+        writer = csv.writer(f)
+        writer.writerow(_columns(photos))
+        for batch in _batches(photos, text, category, status, sort, descending):
+            if photos:
+                batch = [row[:-1] + (CSV_PHOTO_SEPARATOR.join(row[-1]),) for row in batch]
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+
+def export_to_ndjson(filename, photos=False, text="", category=None, status=None,
+                     sort="id", descending=False):
+    """
+    Write the matching artefacts as one JSON object per line. Returns the
+    number of rows. Without photos SQLite writes the JSON (about 3x faster).
+    """
+    columns = _columns(photos)
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    count = 0
+    with open(filename, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        for batch in _batches(photos, text, category, status, sort, descending, as_json=not photos):
+            if photos:
+                batch = [encode(dict(zip(columns, row))) for row in batch]
+            f.write("\n".join(batch))
+            f.write("\n")
+            count += len(batch)
+    return count
+
+
+def export_to_parquet(filename, photos=False, text="", category=None, status=None,
+                      sort="id", descending=False):
+    """
+    Write the matching artefacts as a Parquet file, one row group per batch,
+    with DICTIONARY_COLUMNS dictionary-encoded. Needs pyarrow.
+    Returns the number of rows.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+    fields = []
+    for column in _columns(photos):
+        if column == "id":
+            kind = pa.int64()
+        elif column == "photos":
+            kind = pa.list_(pa.string())
+        elif column in DICTIONARY_COLUMNS:
+            kind = pa.dictionary(pa.int32(), pa.string())
+        else:
+            kind = pa.string()
+        fields.append(pa.field(column, kind))
+    schema = pa.schema(fields)
+
+    count = 0
+    with pq.ParquetWriter(filename, schema) as writer:
+        for batch in _batches(photos, text, category, status, sort, descending):
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(batch)
+    return count
+
+
+EXPORTERS = {
+    ".csv": export_to_csv,
+    ".ndjson": export_to_ndjson,
+    ".jsonl": export_to_ndjson,
+    ".parquet": export_to_parquet,
+}
+
+
+def export_artefacts(path, photos=False, **filters):
+    """
+    Export to path in the format its extension names (.csv, .ndjson/.jsonl,
+    .parquet). filters are passed on as text, category, status, sort and
+    descending. Returns the number of rows written.
+    """
+    exporter = EXPORTERS.get(os.path.splitext(path)[1].lower())
+    if exporter is None:
+        raise ValueError(f"Unknown export format: {path} (use {', '.join(EXPORTERS)})")
+    count = exporter(path, photos=photos, **filters)
+    print(f"📤 Exported {count} artefacts to {path}")
+    return count
@@ -1,8 +1,15 @@
 import sqlite3
 import os
+import json
+import hashlib
 import re
-import shutil
-from PIL import Image
+import threading
+import sys
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+import imaging
 
 # -------------------------
 # Database & Storage Setup
@@ -11,17 +18,211 @@ from PIL import Image
 # Base directory = current working directory (optional, not used here)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Main data folder
-DOCS_DIR = r"C:\GEM DATABASE"
+# Main data folder (GEM_DATA_DIR overrides it for scratch collections)
+DOCS_DIR = os.environ.get("GEM_DATA_DIR", r"C:\GEM DATABASE")
 os.makedirs(DOCS_DIR, exist_ok=True)  # Ensure main folder exists
 
 # Photos subfolder
 PHOTOS_DIR = os.path.join(DOCS_DIR, "photos")
 os.makedirs(PHOTOS_DIR, exist_ok=True)  # Ensure photos folder exists
 
+# Precomputed smaller copies of every photo (see imaging.THUMBNAIL_SIZES)
+THUMBS_DIR = os.path.join(DOCS_DIR, "thumbs")
+
+# Rendered pieces of earlier exports, reused while their artefacts are unchanged
+EXPORT_CACHE_DIR = os.path.join(DOCS_DIR, "export_cache")
+
 # Database path
 DB_NAME = os.path.join(DOCS_DIR, "GGMuseum.db")
 
+# -------------------------
+# Connection Layer
+# -------------------------
+
+# Pragmas applied to every connection we open
+PRAGMAS = (
+    "PRAGMA foreign_keys=ON",
+)
+
+# Further pragmas for the collection database (DB_NAME) only. Other
+# databases, like the users.db shipped in the app folder, keep their
+# default rollback journal: WAL would rewrite the shipped file and leave
+# -wal/-shm files next to it.
+COLLECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers don't block the writer
+    "PRAGMA synchronous=NORMAL",    # safe with WAL, far fewer fsyncs
+    "PRAGMA cache_size=-20000",     # ~20 MB page cache
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped I/O
+)
+
+# ...and for every other database (also turns back a users.db that an
+# earlier build switched to WAL)
+OTHER_PRAGMAS = (
+    "PRAGMA journal_mode=DELETE",
+)
+
+_local = threading.local()
+_states = weakref.WeakSet()     # every live thread's _ThreadState, for close_connections()
+_pools = weakref.WeakSet()      # every live ConnectionPool, likewise
+_connections_lock = threading.Lock()
+_generation = 0                 # bumped by close_connections() so threads reconnect
+_search_index_ready = False     # DB_NAME's schema is migrated, so transaction() syncs the search index
+
+
+def _close_all(connections):
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+class _ThreadState:
+    """
+    One thread's connections and transaction depths. Held only by the
+    thread's local storage, so when the thread ends (or the state is
+    replaced after close_connections) its connections are closed instead
+    of leaking their file handles, page cache and mmap.
+    """
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.connections = {}
+        self.depth = {}
+        weakref.finalize(self, _close_all, self.connections.values())
+
+
+def _thread_state():
+    state = getattr(_local, "state", None)
+    if state is None or state.generation != _generation:
+        state = _local.state = _ThreadState(_generation)
+        with _connections_lock:
+            _states.add(state)
+    return state
+
+
+def open_connection(db_path=None):
+    """Open a new connection to db_path (DB_NAME by default), set up like every other."""
+    db_path = db_path or DB_NAME
+    # autocommit mode: transactions are opened explicitly by transaction()
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    for pragma in PRAGMAS + (COLLECTION_PRAGMAS if db_path == DB_NAME else OTHER_PRAGMAS):
+        conn.execute(pragma)
+    conn.create_function(LOWER_FUNCTION, 1, _lower, deterministic=True)  # see LOWER_FUNCTION
+    return conn
+
+
+def get_connection(db_path=None):
+    """
+    Return this thread's shared connection to db_path (DB_NAME by default).
+    Connections are opened once per thread and reused for every query.
+    """
+    db_path = db_path or DB_NAME
+    state = _thread_state()
+
+    conn = state.connections.get(db_path)
+    if conn is None:
+        conn = state.connections[db_path] = open_connection(db_path)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Connections to db_path lent to one task at a time and reused between
+    tasks. For threads Python doesn't manage (e.g. a QThreadPool's): their
+    thread-local state, and with it get_connection()'s connection, is torn
+    down after every task, and closing a connection there can crash.
+    close() closes the idle connections; close_connections() does too, and
+    a connection lent out at that point is closed when it comes back.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or DB_NAME
+        self._idle = []
+        self._lent = {}     # connection -> _generation it was opened in
+        self._closed = False
+        weakref.finalize(self, _close_all, self._idle)
+        with _connections_lock:
+            _pools.add(self)
+
+    def acquire(self):
+        with _connections_lock:
+            if self._idle:
+                conn = self._idle.pop()
+                self._lent[conn] = _generation
+                return conn
+            generation = _generation
+        conn = open_connection(self.db_path)
+        with _connections_lock:
+            self._lent[conn] = generation
+        return conn
+
+    def release(self, conn):
+        with _connections_lock:
+            generation = self._lent.pop(conn)
+            if not self._closed and generation == _generation:
+                self._idle.append(conn)
+                return
+        _close_all([conn])
+
+    def close(self):
+        with _connections_lock:
+            self._closed = True
+            idle = self._idle[:]
+            self._idle.clear()
+        _close_all(idle)
+
+
+@contextmanager
+def transaction(db_path=None):
+    """
+    Run a block of statements as one transaction and yield a cursor.
+    Commits on success, rolls back on error. Nested calls join the outer
+    transaction, so only the outermost block commits.
+    """
+    db_path = db_path or DB_NAME
+    conn = get_connection(db_path)
+    depth = _thread_state().depth
+    level = depth.get(db_path, 0)
+
+    if level == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    depth[db_path] = level + 1
+    try:
+        yield conn.cursor()
+        if level == 0 and db_path == DB_NAME and _search_index_ready:
+            _sync_search_index(conn.cursor())
+    except BaseException:
+        depth[db_path] = level
+        if level == 0:
+            conn.execute("ROLLBACK")
+        raise
+    depth[db_path] = level
+    if level == 0:
+        conn.execute("COMMIT")
+
+
+def close_connections():
+    """
+    Close every shared connection in every thread.
+    Needed before the database file is replaced on disk, e.g. by a sync.
+    """
+    global _generation, _search_index_ready
+    _search_index_ready = False  # the next file may be older: init_db() migrates it first
+    with _connections_lock:
+        for state in list(_states):
+            _close_all(state.connections.values())
+            state.connections.clear()
+        for pool in list(_pools):
+            _close_all(pool._idle)
+            pool._idle.clear()
+        _generation += 1
+
+
+def checkpoint(db_path=None):
+    """Fold the WAL file back into the main database file (before copying it)."""
+    get_connection(db_path).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
 # -------------------------
 # Dropdown Options
 # -------------------------
@@ -43,224 +244,1076 @@ STATUS_OPTIONS = [
 ]
 
 # -------------------------
-# Database Initialization
+# Full-text Search
 # -------------------------
 
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
+# Every text column the search bar looks at (mirrors the old Python scan,
+# which matched against all fields except the id)
+SEARCH_COLUMNS = (
+    "artefact_code", "name", "category", "origin", "description", "period",
+    "location", "condition", "status", "curator", "date_added",
+)
+
+# Trigram phrase queries need at least this many characters; shorter text
+# is looked up among the indexed trigrams instead (see _SHORT_TEXT_QUERY)
+TRIGRAM_MIN_CHARS = 3
+
+# SQL name of Python's str.lower, registered on every connection we open.
+# The search index holds each artefact's SEARCH_COLUMNS lowered by it, and
+# queries are lowered the same way, so matching ignores case the way the
+# old Python scan did: Georgian Mtavruli (ᲡᲐᲥᲐᲠᲗᲕᲔᲚᲝ) matches Mkhedruli
+# (საქართველო), and Cyrillic or accented Latin fold as well (SQLite's own
+# folding covers ASCII only in LIKE, and predates Mtavruli in FTS5).
+#
+# Only this app's connections know the function, so triggers never call
+# it: other programs writing the database (the sqlite3 shell, DB Browser,
+# scripts, older builds) must keep working. The triggers just queue the
+# changed ids in search_pending; transaction() indexes them before the
+# app's next commit (init_db() too, on startup), and until then searches
+# match queued artefacts on their live values.
+LOWER_FUNCTION = "py_lower"
+
 
-    # Artefacts table
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _search_body():
+    # One lowered text per artefact: the columns joined by a unit separator,
+    # which no search text contains, so a match never spans two columns.
+    # Two more at the end make every character start a trigram.
+    joined = " || char(31) || ".join(f"IFNULL({c}, '')" for c in SEARCH_COLUMNS)
+    return f"{LOWER_FUNCTION}({joined}) || char(31) || char(31)"
+
+
+def _create_search_index(cur):
+    """Create and fill the trigram FTS5 index of lowered artefact text, and the triggers that queue re-indexing."""
+    # Not external content: the lowered text exists nowhere else. Case
+    # sensitive, since it is lowered already: FTS5's own folding differs.
     cur.execute("""
-        CREATE TABLE IF NOT EXISTS artefacts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            artefact_code TEXT UNIQUE,
-            name TEXT NOT NULL,
-            category TEXT,
-            origin TEXT,
-            description TEXT,
-            period TEXT,
-            location TEXT,
-            condition TEXT,
-            status TEXT,
-            curator TEXT,
-            date_added DATE DEFAULT (DATE('now'))
+        CREATE VIRTUAL TABLE IF NOT EXISTS artefacts_fts USING fts5(
+            body, tokenize='trigram case_sensitive 1'
         )
     """)
+    cur.execute("CREATE VIRTUAL TABLE IF NOT EXISTS artefacts_fts_terms USING fts5vocab(artefacts_fts, row)")
+    cur.execute("CREATE TABLE IF NOT EXISTS search_pending (id INTEGER PRIMARY KEY)")
+    cur.execute(_search_insert_trigger())
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS artefacts_search_au AFTER UPDATE OF {", ".join(SEARCH_COLUMNS)} ON artefacts BEGIN
+            INSERT OR IGNORE INTO search_pending (id) VALUES (new.id);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS artefacts_search_ad AFTER DELETE ON artefacts BEGIN
+            INSERT OR IGNORE INTO search_pending (id) VALUES (old.id);
+        END
+    """)
+
+    _index_search(cur)
+
+
+def _search_insert_trigger():
+    return """
+        CREATE TRIGGER IF NOT EXISTS artefacts_search_ai AFTER INSERT ON artefacts BEGIN
+            INSERT OR IGNORE INTO search_pending (id) VALUES (new.id);
+        END
+    """
+
+
+def _index_search(cur, where="1", params=()):
+    """Add the lowered text of the artefacts matching where (not indexed yet) to the search index."""
+    cur.execute(
+        f"INSERT INTO artefacts_fts (rowid, body) SELECT id, {_search_body()} FROM artefacts WHERE {where}",
+        params,
+    )
+
+
+def _sync_search_index(cur):
+    """Re-index the artefacts queued in search_pending (see LOWER_FUNCTION)."""
+    if cur.execute("SELECT 1 FROM search_pending LIMIT 1").fetchone() is None:
+        return
+    cur.execute("DELETE FROM artefacts_fts WHERE rowid IN (SELECT id FROM search_pending)")
+    _index_search(cur, "id IN (SELECT id FROM search_pending)")
+    cur.execute("DELETE FROM search_pending")
+
+
+@contextmanager
+def deferred_search_index(cur):
+    """
+    For bulk inserts, inside transaction(): the per-row search index
+    trigger is suspended and every artefact inserted meanwhile is indexed
+    by one INSERT ... SELECT at the end, about 3x cheaper. On error the
+    transaction rollback restores the trigger.
+    """
+    # AUTOINCREMENT: new ids are always above the current maximum
+    last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM artefacts").fetchone()[0]
+    cur.execute("DROP TRIGGER IF EXISTS artefacts_search_ai")
+    yield
+    _index_search(cur, "id>?", (last_id,))
+    cur.execute(_search_insert_trigger())
+
+
+def _search_filters(text="", category=None, status=None, ids=None):
+    """WHERE clauses and parameters shared by search_artefacts and search_ids."""
+    where, params = [], []
+    if ids is not None:
+        where.append("id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(ids)))
+
+    if text:
+        text = text.lower()
+        if len(text) >= TRIGRAM_MIN_CHARS:
+            # A quoted phrase over trigram tokens is a substring match
+            where.append(_text_match("?"))
+            params.append('"' + text.replace('"', '""') + '"')
+        else:
+            where.append(_text_match(_SHORT_TEXT_QUERY))
+            params += [text, text + chr(sys.maxunicode)]
+        params.append(_like_pattern(text))
+
+    if category:
+        where.append("category=?")
+        params.append(category)
+    if status:
+        where.append("status=?")
+        params.append(status)
+    return where, params
+
+
+def _like_pattern(text):
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# Text under TRIGRAM_MIN_CHARS is the start of a trigram wherever it occurs
+# (see _search_body), so the match is an OR of every indexed trigram that
+# starts with it: cost follows the matches, not the table size. '""'
+# matches nothing.
+_SHORT_TEXT_QUERY = (
+    """COALESCE((SELECT group_concat('"' || replace(term, '"', '""') || '"', ' OR ')"""
+    """ FROM artefacts_fts_terms WHERE term >= ? AND term < ?), '""')"""
+)
+
+
+def _text_match(query):
+    # Artefacts still queued for re-indexing (see LOWER_FUNCTION) are
+    # matched on their live values; search_pending is normally empty
+    return (
+        f"id IN (SELECT rowid FROM artefacts_fts WHERE artefacts_fts MATCH {query}"
+        f" EXCEPT SELECT id FROM search_pending"
+        f" UNION ALL SELECT id FROM artefacts WHERE id IN (SELECT id FROM search_pending)"
+        f" AND {_search_body()} LIKE ? ESCAPE '\\')"
+    )
+
+
+def search_artefacts(text="", category=None, status=None, after_id=None, limit=None, ids=None):
+    """
+    Return Artefact records containing `text` in any field (case-insensitive
+    substring match), optionally limited to one category and/or status.
+    Everything is filtered in a single SQL query.
+
+    Rows come in id order; pass the last id seen as after_id together with
+    limit to read the result page by page. ids restricts the search to
+    those artefacts (e.g. to re-check a few changed rows).
+    """
+    where, params = _search_filters(text, category, status, ids)
+    if after_id is not None:
+        where.append("id>?")
+        params.append(after_id)
+
+    sql = "SELECT * FROM artefacts"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return _artefact_cursor().execute(sql, params).fetchall()
+
+
+def search_ids(text="", category=None, status=None, within=None, sort="id", descending=False, conn=None):
+    """
+    Like search_artefacts, but return only the matching ids, ordered by the
+    sort column (see iter_artefacts).
+
+    within narrows an earlier result instead of searching the whole table:
+    when text extends the text that produced `within`, every new match is
+    already in it, so only those rows are checked. They are matched exactly
+    like a full search, so the result doesn't depend on the earlier text.
+
+    conn runs the query on a given connection instead of this thread's.
+    """
+    where, params = _search_filters(text, category, status, ids=within)
+
+    sql = "SELECT id FROM artefacts"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + _order_by(sort, descending)
+    return [row[0] for row in (conn or get_connection()).execute(sql, params)]
+
+
+def get_artefacts_by_ids(ids):
+    """Return the Artefact records for ids, in the same order (missing ids are skipped)."""
+    cur = _artefact_cursor().execute(
+        "SELECT * FROM artefacts WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(ids)),),
+    )
+    rows = {row.id: row for row in cur.fetchall()}
+    return [rows[i] for i in ids if i in rows]
+
+# -------------------------
+# Sorted Listing
+# -------------------------
+# Results are read in pages with keyset pagination: each page continues
+# after the (sort value, id) of the last row seen, so every page is an
+# index range scan and memory stays flat however large the table is.
+# SQLite puts NULLs first in ascending order and last in descending order.
+
+# Every artefacts column, in table (SELECT *) order
+ARTEFACT_COLUMNS = (
+    "id", "artefact_code", "name", "category", "origin", "description", "period",
+    "location", "condition", "status", "curator", "date_added", "updated_at",
+)
+
+LIST_PAGE_SIZE = 500
+
+
+def _check_column(column):
+    # Column names are interpolated into SQL, so only known ones get through
+    if column not in ARTEFACT_COLUMNS:
+        raise ValueError(f"Unknown artefact column: {column}")
+    return column
+
+
+def _order_by(sort, descending):
+    direction = " DESC" if descending else ""
+    if _check_column(sort) == "id":
+        return "id" + direction
+    return f"{sort}{direction}, id{direction}"
+
+
+def _keyset_ranges(sort, descending, value, artefact_id):
+    """
+    The rows that sort after (value, artefact_id), as a list of
+    (WHERE clause, params) ranges in sort order. Each range is a single
+    index seek; an OR of them would make SQLite scan from the start.
+    """
+    if sort == "id":
+        return [("id<?" if descending else "id>?", [artefact_id])]
+    if descending:
+        if value is None:
+            return [(f"{sort} IS NULL AND id<?", [artefact_id])]
+        return [(f"({sort}, id) < (?, ?)", [value, artefact_id]), (f"{sort} IS NULL", [])]
+    if value is None:
+        return [(f"{sort} IS NULL AND id>?", [artefact_id]), (f"{sort} IS NOT NULL", [])]
+    return [(f"({sort}, id) > (?, ?)", [value, artefact_id])]
+
+
+def iter_artefacts(columns=None, sort="id", descending=False, text="", category=None, status=None,
+                   page_size=LIST_PAGE_SIZE, as_json=False):
+    """
+    Yield Artefact records (or, given `columns`, tuples of just those
+    columns) sorted by the `sort` column, then id, optionally filtered like
+    search_artefacts. Rows are read page_size at a time, so only one page is
+    ever in memory. With as_json, each row comes as the text of a JSON
+    object of `columns`, built by SQLite (much cheaper than a tuple).
+    """
+    if columns is None:
+        select = list(ARTEFACT_COLUMNS)
+        width = None
+        cur = _artefact_cursor()
+        keyset = lambda row: (getattr(row, sort), row.id)
+    else:
+        columns = [_check_column(c) for c in columns]
+        if as_json:
+            pairs = ", ".join(f"'{c}', {c}" for c in columns)
+            columns = [f"json_object({pairs})"]
+        # The keyset needs the sort value and id of each row, projected or not
+        select = columns + [c for c in dict.fromkeys((sort, "id")) if c not in columns]
+        width = len(columns) if len(select) > len(columns) else None
+        cur = get_connection().cursor()
+        sort_pos, id_pos = select.index(sort), select.index("id")
+        keyset = lambda row: (row[sort_pos], row[id_pos])
+    order = _order_by(sort, descending)
+
+    ranges = [(None, [])]  # first page: no keyset
+    while True:
+        rows = []
+        for clause, values in ranges:
+            where, params = _search_filters(text, category, status)
+            if clause:
+                where.append(clause)
+                params.extend(values)
+            sql = f"SELECT {', '.join(select)} FROM artefacts"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += f" ORDER BY {order} LIMIT ?"
+            rows.extend(cur.execute(sql, params + [page_size - len(rows)]).fetchall())
+            if len(rows) == page_size:
+                break
+
+        if as_json:
+            for row in rows:
+                yield row[0]
+        else:
+            for row in rows:
+                yield row if width is None else row[:width]
+        if len(rows) < page_size:
+            return
+        ranges = _keyset_ranges(sort, descending, *keyset(rows[-1]))
+
+
+def count_sorted_before(artefact_ids, sort, descending, value, artefact_id):
+    """How many of artefact_ids sort before the row (value, artefact_id)."""
+    ranges = _keyset_ranges(_check_column(sort), descending, value, artefact_id)
+    # IFNULL: a row-value comparison against a NULL column is NULL, not false
+    after = " OR ".join(f"IFNULL(({clause}), 0)" for clause, _ in ranges)
+    params = [json.dumps(list(artefact_ids))]
+    for _, values in ranges:
+        params.extend(values)
+    return get_connection().execute(
+        f"SELECT COUNT(*) FROM artefacts WHERE id IN (SELECT value FROM json_each(?)) "
+        f"AND NOT ({after}) AND id<>?",
+        params + [artefact_id],
+    ).fetchone()[0]
+
+# -------------------------
+# Artefact Records
+# -------------------------
+
+# Columns the add/edit form fills in, in INSERT/UPDATE order
+EDITABLE_COLUMNS = ARTEFACT_COLUMNS[1:11]
+
+
+class Artefact:
+    """
+    One artefacts row with named fields (see ARTEFACT_COLUMNS). __slots__
+    means no per-instance __dict__, so a record costs about what the
+    equivalent tuple did. Built straight from cursors by from_row.
+    """
+
+    __slots__ = ARTEFACT_COLUMNS
+
+    def __init__(self, id=None, artefact_code=None, name=None, category=None, origin=None,
+                 description=None, period=None, location=None, condition=None, status=None,
+                 curator=None, date_added=None, updated_at=None):
+        self.id = id
+        self.artefact_code = artefact_code
+        self.name = name
+        self.category = category
+        self.origin = origin
+        self.description = description
+        self.period = period
+        self.location = location
+        self.condition = condition
+        self.status = status
+        self.curator = curator
+        self.date_added = date_added
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """sqlite3 row_factory for SELECT * FROM artefacts."""
+        return cls(*row)
+
+    def editable_values(self):
+        """The EDITABLE_COLUMNS values, as add_artefact/update_artefact bind them."""
+        return tuple(getattr(self, c) for c in EDITABLE_COLUMNS)
+
+    def __repr__(self):
+        return f"Artefact(id={self.id!r}, artefact_code={self.artefact_code!r}, name={self.name!r})"
+
 
-    # Images table
+def _artefact_cursor():
+    cur = get_connection().cursor()
+    cur.row_factory = Artefact.from_row
+    return cur
+
+
+def _editable_values(artefact):
+    # Artefact records and plain sequences in EDITABLE_COLUMNS order are both accepted
+    return artefact.editable_values() if isinstance(artefact, Artefact) else tuple(artefact)
+
+# -------------------------
+# Database Initialization
+# -------------------------
+
+def init_db():
+    with transaction() as cur:
+        # Artefacts table
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS artefacts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                artefact_code TEXT UNIQUE,
+                name TEXT NOT NULL,
+                category TEXT,
+                origin TEXT,
+                description TEXT,
+                period TEXT,
+                location TEXT,
+                condition TEXT,
+                status TEXT,
+                curator TEXT,
+                date_added DATE DEFAULT (DATE('now'))
+            )
+        """)
+
+        # Images table
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS artefact_images (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                artefact_id INTEGER,
+                image_path TEXT,
+                FOREIGN KEY (artefact_id) REFERENCES artefacts(id) ON DELETE CASCADE
+            )
+        """)
+
+    migrate()
+
+    # Index what other programs changed meanwhile (see LOWER_FUNCTION)
+    with transaction() as cur:
+        _sync_search_index(cur)
+
+# -------------------------
+# Schema Migrations
+# -------------------------
+# Each migration runs once, in order, in its own transaction. PRAGMA
+# user_version records how many have been applied, so existing
+# GGMuseum.db files are upgraded in place. Only ever append to the list.
+
+def _migration_indexes(cur):
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefact_images_artefact ON artefact_images(artefact_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefacts_category ON artefacts(category)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefacts_status ON artefacts(status)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefacts_date_added ON artefacts(date_added)")
+
+
+def _migration_image_position(cur):
+    cur.execute("ALTER TABLE artefact_images ADD COLUMN position INTEGER NOT NULL DEFAULT 0")
+
+    # Number existing photos in the order get_images used to sort them:
+    # by filename, with CODE_2 before CODE_10
+    def sort_key(filename):
+        name = os.path.splitext(filename)[0]
+        parts = name.rsplit("_", 1)
+        if len(parts) == 2 and parts[1].isdigit():
+            return (parts[0], int(parts[1]))
+        return (name, 0)
+
+    photos = {}
+    cur.execute("SELECT id, artefact_id, image_path FROM artefact_images")
+    for image_id, artefact_id, filename in cur.fetchall():
+        photos.setdefault(artefact_id, []).append((sort_key(filename or ""), image_id))
+
+    updates = []
+    for rows in photos.values():
+        rows.sort()
+        updates.extend((position, image_id) for position, (_, image_id) in enumerate(rows))
+    cur.executemany("UPDATE artefact_images SET position=? WHERE id=?", updates)
+
+    # (artefact_id, position) also covers lookups by artefact_id alone
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefact_images_order ON artefact_images(artefact_id, position)")
+    cur.execute("DROP INDEX IF EXISTS idx_artefact_images_artefact")
+
+
+def _migration_content_addressed_photos(cur):
+    # New photos are stored as <sha256>.jpg; the code-based name is kept for display
+    cur.execute("ALTER TABLE artefact_images ADD COLUMN content_hash TEXT")
+    cur.execute("ALTER TABLE artefact_images ADD COLUMN display_name TEXT")
+    cur.execute("UPDATE artefact_images SET display_name=image_path")
+    # Reference counting looks rows up by stored file
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefact_images_path ON artefact_images(image_path)")
+
+
+def _migration_change_log(cur):
+    # updated_at can't get a DATETIME('now') default through ALTER TABLE,
+    # so the triggers below stamp it
+    cur.execute("ALTER TABLE artefacts ADD COLUMN updated_at TEXT")
+    cur.execute("UPDATE artefacts SET updated_at=date_added")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_artefacts_updated_at ON artefacts(updated_at)")
+
+    # Append-only journal of every row change; seq is the cursor consumers keep
     cur.execute("""
-        CREATE TABLE IF NOT EXISTS artefact_images (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
             artefact_id INTEGER,
-            image_path TEXT,
-            FOREIGN KEY (artefact_id) REFERENCES artefacts(id) ON DELETE CASCADE
+            op TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))
         )
     """)
 
-    conn.commit()
-    conn.close()
+    now = "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS artefacts_log_ai AFTER INSERT ON artefacts BEGIN
+            UPDATE artefacts SET updated_at={now} WHERE id=new.id AND updated_at IS NULL;
+            INSERT INTO change_log (table_name, row_id, artefact_id, op) VALUES ('artefacts', new.id, new.id, 'insert');
+        END
+    """)
+    # Skipped when updated_at itself changes: that is the stamp above
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS artefacts_log_au AFTER UPDATE ON artefacts
+        WHEN new.updated_at IS old.updated_at BEGIN
+            UPDATE artefacts SET updated_at={now} WHERE id=new.id;
+            INSERT INTO change_log (table_name, row_id, artefact_id, op) VALUES ('artefacts', new.id, new.id, 'update');
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS artefacts_log_ad AFTER DELETE ON artefacts BEGIN
+            INSERT INTO change_log (table_name, row_id, artefact_id, op) VALUES ('artefacts', old.id, old.id, 'delete');
+        END
+    """)
+    for op, row in (("insert", "new"), ("update", "new"), ("delete", "old")):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS artefact_images_log_{op} AFTER {op.upper()} ON artefact_images BEGIN
+                INSERT INTO change_log (table_name, row_id, artefact_id, op)
+                VALUES ('artefact_images', {row}.id, {row}.artefact_id, '{op}');
+            END
+        """)
+
+
+def _migration_sort_indexes(cur):
+    # One index per column the table can be sorted by. An index on a
+    # column also orders by rowid (= id), so it serves ORDER BY col, id and
+    # the keyset range of iter_artefacts. artefact_code already has its
+    # UNIQUE index; category, status, date_added and updated_at have theirs.
+    for column in ("name", "origin", "description", "period", "location", "condition", "curator"):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_artefacts_{column} ON artefacts({column})")
+
+
+def _migration_superseded(cur):
+    # Its work is redone by a later migration; kept so user_version
+    # numbering stays the same
+    pass
+
+
+def _migration_search_pending(cur):
+    # The index stored lowered copies of the artefacts columns kept in sync
+    # by triggers that called LOWER_FUNCTION, so other programs couldn't
+    # write to artefacts. Rebuild it as a table of its own, with triggers
+    # that only queue changed ids.
+    for trigger in ("artefacts_fts_ai", "artefacts_fts_ad", "artefacts_fts_au"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP TABLE IF EXISTS artefacts_fts")
+    _create_search_index(cur)
+
+
+MIGRATIONS = [
+    ("search index", _migration_superseded),   # now part of migration 8
+    ("lookup indexes", _migration_indexes),
+    ("photo ordering", _migration_image_position),
+    ("content-addressed photos", _migration_content_addressed_photos),
+    ("change log", _migration_change_log),
+    ("sort indexes", _migration_sort_indexes),
+    ("lowered search index", _migration_superseded),   # now part of migration 8
+    ("search index without Python triggers", _migration_search_pending),
+]
+
+
+def migrate():
+    """Apply pending MIGRATIONS and log how long each one took."""
+    global _search_index_ready
+    if get_connection().execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        _search_index_ready = True
+        return
+
+    for version, (name, migration) in enumerate(MIGRATIONS, start=1):
+        with transaction() as cur:
+            # Re-read inside the write lock in case another process migrated first
+            current = cur.execute("PRAGMA user_version").fetchone()[0]
+            if current >= version:
+                continue
+
+            start = time.perf_counter()
+            migration(cur)
+            cur.execute(f"PRAGMA user_version={version}")
+            elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"🛠 Migration {version} ({name}) applied in {elapsed:.1f} ms")
+    _search_index_ready = True
 
 # -------------------------
 # Artefact Functions
 # -------------------------
 
 def add_artefact(artefact):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO artefacts 
-        (artefact_code, name, category, origin, description, period, location, condition, status, curator) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, artefact)
-    conn.commit()
-    conn.close()
-
-def get_artefacts():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM artefacts")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    """Insert an artefact (an Artefact or its EDITABLE_COLUMNS values) and return its new id."""
+    with transaction() as cur:
+        cur.execute("""
+            INSERT INTO artefacts 
+            (artefact_code, name, category, origin, description, period, location, condition, status, curator) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, _editable_values(artefact))
+        return cur.lastrowid
+
+def get_artefacts(sort="id", descending=False):
+    """Iterate over every artefact row, in sort order (see iter_artefacts)."""
+    return iter_artefacts(sort=sort, descending=descending)
 
 def update_artefact(artefact_id, artefact):
-    code = artefact[0]
+    values = _editable_values(artefact)
+    code = values[0]
 
-    # Prevent duplicate codes
-    if artefact_code_exists_for_other(code, artefact_id):
-        raise ValueError(f"კოდი '{code}' უკვე გამოიყენება სხვა არტეფაქტში.")
+    with transaction() as cur:
+        # Prevent duplicate codes
+        if artefact_code_exists_for_other(code, artefact_id):
+            raise ValueError(f"კოდი '{code}' უკვე გამოიყენება სხვა არტეფაქტში.")
 
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("""
-        UPDATE artefacts 
-        SET artefact_code=?, name=?, category=?, origin=?, description=?, 
-            period=?, location=?, condition=?, status=?, curator=? 
-        WHERE id=?
-    """, (*artefact, artefact_id))
-    conn.commit()
-    conn.close()
+        cur.execute("""
+            UPDATE artefacts 
+            SET artefact_code=?, name=?, category=?, origin=?, description=?, 
+                period=?, location=?, condition=?, status=?, curator=? 
+            WHERE id=?
+        """, (*values, artefact_id))
+    return artefact_id
 
 def delete_artefact(artefact_id):
-    """Delete artefact and all its photos (DB + disk)."""
+    """Delete artefact and all its photos (DB + disk). Returns the id."""
     photos = get_images(artefact_id)
 
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM artefacts WHERE id=?", (artefact_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        # artefact_images rows go with it (ON DELETE CASCADE)
+        cur.execute("DELETE FROM artefacts WHERE id=?", (artefact_id,))
 
-    for path in photos:
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except Exception as e:
-            print(f"⚠ Could not delete {path}: {e}")
+    remove_photo_files(photos)
+    return artefact_id
+
+def bulk_update_artefacts(artefact_ids, changes):
+    """
+    Set the same field values on many artefacts with one UPDATE in one
+    transaction. changes maps EDITABLE_COLUMNS names (except the unique
+    artefact_code) to values. Rows that already have those values are left
+    alone, so they are not logged as changed. Returns the number of rows
+    updated.
+    """
+    for column in changes:
+        if column not in EDITABLE_COLUMNS or column == "artefact_code":
+            raise ValueError(f"Column can't be bulk-edited: {column}")
+    if not changes or not artefact_ids:
+        return 0
+
+    columns = list(changes)
+    values = [changes[c] for c in columns]
+    with transaction() as cur:
+        cur.execute(f"""
+            UPDATE artefacts SET {", ".join(f"{c}=?" for c in columns)}
+            WHERE id IN (SELECT value FROM json_each(?))
+              AND ({" OR ".join(f"{c} IS NOT ?" for c in columns)})
+        """, (*values, json.dumps(list(artefact_ids)), *values))
+        return cur.rowcount
+
+def save_artefact(artefact, images, progress=None):
+    """
+    Add (artefact.id is None) or update an artefact and make its photo list
+    match `images`, as one unit of work: the fields, removed photos and new
+    photos are committed in a single transaction, so a crash mid-save leaves
+    either the old artefact or the new one, never a mix.
+
+    images is the form's list: stored photos (their photo_path) are kept,
+    other existing files are ingested, and paths whose file is gone are
+    linked if PHOTOS_DIR already has that filename, else skipped. Slow image
+    processing happens before the transaction opens; photo files of removed
+    rows are left for photo_gc. Raises ValueError if the code is taken.
+    Returns the artefact id.
+    """
+    values = _editable_values(artefact)
+    if artefact_code_exists_for_other(values[0], artefact.id if artefact.id is not None else -1):
+        # Checked again under the write lock below; this just fails before any photo work
+        raise ValueError(f"კოდი '{values[0]}' უკვე გამოიყენება სხვა არტეფაქტში.")
+
+    current = set(r[0] for r in get_connection().execute(
+        "SELECT image_path FROM artefact_images WHERE artefact_id=?", (artefact.id,)
+    )) if artefact.id is not None else set()
+
+    kept, sources, stored = set(), [], []
+    for path in images:
+        filename = os.path.basename(path)
+        if filename in current:
+            kept.add(filename)
+        elif os.path.exists(path):
+            sources.append(path)
+        elif os.path.exists(photo_path(filename)):
+            stored.append((filename, None))
+        else:
+            print(f"⚠ Skipping missing image: {path}")
+
+    new_photos = stored + ingest_photos(sources, progress)
+
+    with transaction() as cur:
+        if artefact.id is None:
+            if artefact_code_exists(values[0]):
+                raise ValueError(f"კოდი '{values[0]}' უკვე გამოიყენება სხვა არტეფაქტში.")
+            artefact_id = add_artefact(values)
+        else:
+            artefact_id = update_artefact(artefact.id, values)
+
+        # Photo rows the form dropped go; their files stay until photo_gc runs
+        cur.executemany(
+            "DELETE FROM artefact_images WHERE artefact_id=? AND image_path=?",
+            [(artefact_id, filename) for filename in current - kept],
+        )
+        for filename, content_hash in new_photos:
+            link_image(artefact_id, filename, content_hash)
+    return artefact_id
 
 def get_artefact_by_id(artefact_id):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM artefacts WHERE id=?", (artefact_id,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    """The Artefact record for artefact_id, or None."""
+    cur = _artefact_cursor().execute("SELECT * FROM artefacts WHERE id=?", (artefact_id,))
+    return cur.fetchone()
 
 # -------------------------
 # Image Functions
 # -------------------------
 
+_pool = None
+
+
+def _photo_pool():
+    """Process pool shared by all photo ingestion (started on first use)."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor()
+    return _pool
+
+
 def add_image(artefact_id, image_path):
     """
     Copy & compress the image into PHOTOS_DIR.
-    Save with artefact_code-based name, avoid overwriting by suffix.
-    Only the filename is stored in DB.
+    It is stored under the SHA-256 of its content, so attaching the same
+    photo twice keeps one file; the DB row also gets a CODE_N.jpg display name.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT artefact_code FROM artefacts WHERE id=?", (artefact_id,))
-    result = cur.fetchone()
-    conn.close()
+    add_images(artefact_id, [image_path])
 
-    if not result:
+
+def add_images(artefact_id, image_paths, progress=None):
+    """
+    Ingest many photos for one artefact. Decoding, resizing and encoding
+    run in a process pool; the DB rows are then inserted in one
+    transaction. progress(done, total) is called as photos finish.
+    Returns the stored filenames.
+    """
+    cur = get_connection().execute("SELECT 1 FROM artefacts WHERE id=?", (artefact_id,))
+    if not cur.fetchone():
         raise ValueError("Artefact not found in database")
 
-    artefact_code = result[0]
+    photos = ingest_photos(image_paths, progress)
 
-    base_name = artefact_code
-    dest_filename = f"{base_name}.jpg"
-    dest_path = os.path.join(PHOTOS_DIR, dest_filename)
+    # Save only the filenames in DB
+    with transaction():
+        for filename, content_hash in photos:
+            link_image(artefact_id, filename, content_hash)
+    return [filename for filename, _ in photos]
 
-    counter = 1
-    while os.path.exists(dest_path):
-        dest_filename = f"{base_name}_{counter}.jpg"
-        dest_path = os.path.join(PHOTOS_DIR, dest_filename)
-        counter += 1
+def ingest_photos(image_paths, progress=None):
+    """
+    Store photo files (masters + thumbnails) without touching the DB.
+    Returns [(filename, content_hash)] in image_paths order, ready for
+    link_image. progress(done, total) is called as photos finish.
+    """
+    # Content-addressed names: no probing for free names, and a photo that
+    # is already stored (or repeated in this batch) is not processed again
+    hashes = [imaging.file_hash(src) for src in image_paths]
+    jobs = {}
+    for src, content_hash in zip(image_paths, hashes):
+        filename = f"{content_hash}.jpg"
+        dest_path = photo_path(filename)
+        if content_hash in jobs:
+            continue
+        if os.path.exists(dest_path):
+            # Reused file: refresh its mtime so the orphan collector (photo_gc)
+            # doesn't sweep it before our row is committed
+            os.utime(dest_path)
+            continue
+        jobs[content_hash] = (src, dest_path, thumbnail_targets(filename))
 
-    try:
-        img = Image.open(image_path)
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
+    total = len(image_paths)
+    skipped = total - len(jobs)
+    if progress and skipped:
+        progress(skipped, total)
 
-        max_size = (1600, 1600)
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    if len(jobs) == 1:
+        # Not worth a round trip to another process
+        imaging.ingest_photo(*next(iter(jobs.values())))
+        if progress:
+            progress(total, total)
+    elif jobs:
+        futures = [_photo_pool().submit(imaging.ingest_photo, *job) for job in jobs.values()]
+        for done, future in enumerate(as_completed(futures), start=skipped + 1):
+            future.result()
+            if progress:
+                progress(done, total)
 
-        img.save(dest_path, "JPEG", quality=70, optimize=True, progressive=True)
+    return [(f"{content_hash}.jpg", content_hash) for content_hash in hashes]
 
-    except Exception as e:
-        print(f"⚠ Image processing failed, copying original: {e}")
-        shutil.copy2(image_path, dest_path)
+def link_image(artefact_id, filename, content_hash=None):
+    """
+    Reference a file already in PHOTOS_DIR as the artefact's last photo.
+    Its display name is derived from the artefact code: CODE.jpg, CODE_1.jpg, ...
+    """
+    with transaction() as cur:
+        cur.execute("""
+            INSERT INTO artefact_images (artefact_id, image_path, position, content_hash, display_name)
+            SELECT a.id, ?, p.position, ?,
+                   a.artefact_code || CASE p.position WHEN 0 THEN '' ELSE '_' || p.position END || '.jpg'
+            FROM artefacts a,
+                 (SELECT COALESCE(MAX(position) + 1, 0) AS position
+                  FROM artefact_images WHERE artefact_id=?) p
+            WHERE a.id=?
+        """, (filename, content_hash, artefact_id, artefact_id))
 
-    # Save only the filename in DB
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO artefact_images (artefact_id, image_path) VALUES (?, ?)",
-        (artefact_id, dest_filename)
+def photo_refcount(filename):
+    """How many artefact_images rows reference the stored file `filename`."""
+    cur = get_connection().execute(
+        "SELECT COUNT(*) FROM artefact_images WHERE image_path=?", (filename,)
     )
-    conn.commit()
-    conn.close()
+    return cur.fetchone()[0]
 
 def get_images(artefact_id):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT image_path FROM artefact_images WHERE artefact_id=?", (artefact_id,))
-    rows = [r[0] for r in cur.fetchall()]
-    conn.close()
+    cur = get_connection().execute(
+        "SELECT image_path FROM artefact_images WHERE artefact_id=? ORDER BY position, id",
+        (artefact_id,),
+    )
 
     # Convert filenames back to absolute paths
-    full_paths = [os.path.join(PHOTOS_DIR, r) for r in rows]
+    return [photo_path(r[0]) for r in cur.fetchall()]
 
-    # Sort numerically by suffix
-    def sort_key(p):
-        name = os.path.splitext(os.path.basename(p))[0]
-        parts = name.rsplit("_", 1)
-        if len(parts) == 2 and parts[1].isdigit():
-            return (parts[0], int(parts[1]))
-        return (name, 0)
+def get_images_with_names(artefact_id):
+    """[(absolute path, display name)] of an artefact's photos, in order."""
+    cur = get_connection().execute(
+        "SELECT image_path, COALESCE(display_name, image_path) FROM artefact_images "
+        "WHERE artefact_id=? ORDER BY position, id",
+        (artefact_id,),
+    )
+    return [(photo_path(path), name) for path, name in cur.fetchall()]
+
+def get_images_for(artefact_ids=None):
+    """
+    Return {artefact_id: [absolute photo paths]} for many artefacts in one query.
+    artefact_ids=None returns the photos of every artefact.
+    """
+    sql = "SELECT artefact_id, image_path FROM artefact_images"
+    params = ()
+    if artefact_ids is not None:
+        sql += " WHERE artefact_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(artefact_ids)),)
+    sql += " ORDER BY artefact_id, position, id"
+
+    images = {}
+    for artefact_id, filename in get_connection().execute(sql, params):
+        images.setdefault(artefact_id, []).append(photo_path(filename))
+    return images
+
+def get_first_image_map(artefact_ids=None):
+    """
+    Return {artefact_id: absolute path of its first photo} in one query,
+    for previews. Artefacts without photos are missing from the dict.
+    """
+    where = ""
+    params = ()
+    if artefact_ids is not None:
+        where = "WHERE artefact_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(artefact_ids)),)
+    sql = f"""
+        SELECT artefact_id, image_path FROM (
+            SELECT artefact_id, image_path,
+                   ROW_NUMBER() OVER (PARTITION BY artefact_id ORDER BY position, id) AS rn
+            FROM artefact_images {where}
+        ) WHERE rn = 1
+    """
+
+    return {
+        artefact_id: photo_path(filename)
+        for artefact_id, filename in get_connection().execute(sql, params)
+    }
 
-    full_paths.sort(key=sort_key)
-    return full_paths
+def remove_photo_files(paths):
+    """
+    Delete photos (absolute master paths) and their thumbnails from disk,
+    unless another artefact_images row still references the file.
+    """
+    for path in paths:
+        filename = os.path.basename(path)
+        if photo_refcount(filename):
+            continue
+        for target in [path, *thumbnail_targets(filename).values()]:
+            try:
+                if os.path.exists(target):
+                    os.remove(target)
+            except Exception as e:
+                print(f"⚠ Could not delete {target}: {e}")
 
 def delete_images(artefact_id):
     photos = get_images(artefact_id)
 
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM artefact_images WHERE artefact_id=?", (artefact_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        cur.execute("DELETE FROM artefact_images WHERE artefact_id=?", (artefact_id,))
 
-    for path in photos:
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except Exception as e:
-            print(f"⚠ Could not delete {path}: {e}")
+    remove_photo_files(photos)
+
+# -------------------------
+# Photo Layout
+# -------------------------
+# Photos and thumbnails live in hashed two-level subfolders (photos/3f/a2/...)
+# so no single directory grows to tens of thousands of entries.
+
+# Written by migrate_photo_layout() once no photo is left in the flat
+# layout; from then on photo_path() skips its existence checks. Kept
+# outside PHOTOS_DIR, which photo_gc and the backup walk.
+PHOTO_LAYOUT_MARKER = os.path.join(DOCS_DIR, "photos_sharded")
+_photos_sharded = os.path.exists(PHOTO_LAYOUT_MARKER)
+
+def _shard(filename):
+    """Two-level subfolder for a stored file, e.g. '3f/a2'."""
+    digest = hashlib.md5(filename.encode("utf-8")).hexdigest()
+    return os.path.join(digest[:2], digest[2:4])
+
+def photo_path(filename):
+    """
+    Absolute path of a stored photo. Every lookup and write goes through
+    here: the sharded location, or the old flat one for photos that
+    migrate_photo_layout() hasn't moved yet. Once it has moved them all,
+    no disk access is needed (readers fall back to the flat location only
+    when the file is missing, see get_thumbnail).
+    """
+    sharded = os.path.join(PHOTOS_DIR, _shard(filename), filename)
+    if _photos_sharded:
+        return sharded
+    if os.path.exists(sharded):
+        return sharded
+    flat = os.path.join(PHOTOS_DIR, filename)
+    if os.path.exists(flat):
+        return flat
+    return sharded
+
+def migrate_photo_layout(progress=None):
+    """
+    Move photos and thumbnails still stored flat into their shard folders.
+    Safe to run while the app is in use and resumable: each move is an
+    atomic rename, and whatever is left flat is picked up by the next run.
+    When nothing is left, PHOTO_LAYOUT_MARKER is written.
+    Returns how many files were moved.
+    """
+    global _photos_sharded
+    flat_dirs = [PHOTOS_DIR] + [
+        os.path.join(THUMBS_DIR, str(size)) for size in imaging.THUMBNAIL_SIZES
+    ]
+    moved, failed = 0, False
+    for directory in flat_dirs:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            dest = os.path.join(directory, _shard(entry.name), entry.name)
+            try:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.replace(entry.path, dest)
+            except OSError as e:
+                # e.g. the file is open in another program; retried next run
+                print(f"⚠ Could not move {entry.path}: {e}")
+                failed = True
+                continue
+            moved += 1
+            if progress:
+                progress(moved)
+
+    if not failed and not _photos_sharded:
+        with open(PHOTO_LAYOUT_MARKER, "w", encoding="utf-8") as f:
+            f.write("photos and thumbnails are sharded\n")
+        _photos_sharded = True
+    return moved
+
+def migrate_photo_layout_in_background():
+    """Start migrate_photo_layout() on a daemon thread."""
+    thread = threading.Thread(target=migrate_photo_layout, daemon=True)
+    thread.start()
+    return thread
+
+# -------------------------
+# Thumbnails
+# -------------------------
+
+def thumbnail_targets(filename):
+    """{size: path} of every derivative of the photo stored as filename."""
+    return {
+        size: os.path.join(THUMBS_DIR, str(size), _shard(filename), filename)
+        for size in imaging.THUMBNAIL_SIZES
+    }
+
+def get_thumbnail(image_path, size):
+    """
+    Best file to display image_path (an absolute photo path) at `size` px:
+    the smallest derivative at least that big, or the master itself.
+    """
+    filename = os.path.basename(image_path)
+    for thumb_size, path in sorted(thumbnail_targets(filename).items()):
+        if thumb_size >= size and os.path.exists(path):
+            return path
+    if not os.path.exists(image_path):
+        # e.g. a flat photos folder restored after PHOTO_LAYOUT_MARKER was written
+        flat = os.path.join(PHOTOS_DIR, filename)
+        if os.path.exists(flat):
+            return flat
+    return image_path
+
+def backfill_thumbnails(workers=None, progress=None):
+    """
+    Generate missing derivatives for every stored photo, spread over
+    `workers` processes (all cores by default). Returns how many photos
+    were processed. progress(done, total) is called as they finish.
+    """
+    cur = get_connection().execute("SELECT DISTINCT image_path FROM artefact_images")
+    jobs = []
+    for (filename,) in cur.fetchall():
+        master = photo_path(filename)
+        targets = thumbnail_targets(filename)
+        if os.path.exists(master) and not all(os.path.exists(p) for p in targets.values()):
+            jobs.append((master, targets))
+
+    if not jobs:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(imaging.make_thumbnails, master, targets) for master, targets in jobs]
+        for done, future in enumerate(futures, start=1):
+            future.result()
+            if progress:
+                progress(done, len(jobs))
+    return len(jobs)
+
+# -------------------------
+# Change Log
+# -------------------------
+
+def changes_since(seq=0, limit=None):
+    """
+    Row changes recorded after `seq`, oldest first, as
+    (seq, table_name, row_id, artefact_id, op) tuples; op is
+    'insert', 'update' or 'delete'. Keep the last seq you processed
+    and pass it back next time to get only the deltas.
+    """
+    sql = "SELECT seq, table_name, row_id, artefact_id, op FROM change_log WHERE seq>? ORDER BY seq"
+    params = [seq]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return get_connection().execute(sql, params).fetchall()
+
+def latest_change_seq(conn=None):
+    """The newest change_log seq (0 if nothing was recorded yet)."""
+    return (conn or get_connection()).execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
 
 # -------------------------
 # Code Validation
 # -------------------------
 
 def artefact_code_exists(code):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM artefacts WHERE artefact_code=?", (code,))
-    exists = cur.fetchone()[0] > 0
-    conn.close()
-    return exists
+    cur = get_connection().execute("SELECT COUNT(*) FROM artefacts WHERE artefact_code=?", (code,))
+    return cur.fetchone()[0] > 0
 
 def artefact_code_exists_for_other(code, artefact_id):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute(
+    cur = get_connection().execute(
         "SELECT COUNT(*) FROM artefacts WHERE artefact_code=? AND id<>?",
         (code, artefact_id),
     )
-    exists = cur.fetchone()[0] > 0
-    conn.close()
-    return exists
-
-
-
+    return cur.fetchone()[0] > 0
@@ -1,8 +1,18 @@
+import hashlib
+import json
+import math
 import os
-import sqlite3
+import tempfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from xml.sax.saxutils import escape
 import openpyxl
 from openpyxl.styles import Font, Alignment
 from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
@@ -13,7 +23,12 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER
-from database import DB_NAME, get_images
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject
+from database import (
+    EXPORT_CACHE_DIR, iter_artefacts, search_ids, get_first_image_map, get_thumbnail
+)
+from imaging import print_copy
 
 
 # ---------------- FONT SETUP ----------------
@@ -31,190 +46,459 @@ HEADERS = [
     "პერიოდი", "მდებარეობა", "მდგომარეობა", "სტატუსი", "კურატორი", "თარიღი"
 ]
 
-def get_all_artefacts():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id, artefact_code, name, category, origin, description,
-               period, location, condition, status, curator, date_added
-        FROM artefacts
-    """)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+# Columns behind HEADERS, in the same order
+EXPORT_COLUMNS = (
+    "id", "artefact_code", "name", "category", "origin", "description",
+    "period", "location", "condition", "status", "curator", "date_added",
+)
+
+def get_export_rows(text="", category=None, status=None, sort="id", descending=False):
+    """
+    Iterate over the EXPORT_COLUMNS rows of the artefacts matching the
+    filters (same arguments as iter_artefacts), page by page.
+    """
+    return iter_artefacts(columns=EXPORT_COLUMNS, text=text, category=category, status=status,
+                          sort=sort, descending=descending)
+
+# ---------------- EXPORT CACHE ----------------
+# Rendered pieces of earlier exports (PDF chunks, Excel row blocks) are kept
+# in EXPORT_CACHE_DIR, named by a hash of everything they were rendered
+# from: the artefacts' fields and photos and EXPORT_CACHE_VERSION, never
+# their position. Pieces end after the artefacts whose id hash falls in a
+# 1-in-N bucket, so an edit, insert or delete only changes the piece it
+# lands in; the pieces before and after it are cut exactly as before.
+# A re-export only renders the pieces whose artefacts changed and copies
+# the rest.
+
+# Bump when the rendered output changes, so older pieces are not reused
+EXPORT_CACHE_VERSION = 3
+
+# Pieces no export has used for this many days are deleted
+EXPORT_CACHE_DAYS = 30
+
+
+def _cache_key(*parts):
+    data = json.dumps([EXPORT_CACHE_VERSION, *parts], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _cache_path(kind, key, ext):
+    directory = os.path.join(EXPORT_CACHE_DIR, kind)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, key + ext)
+
+
+def _cached(path):
+    """True if path is in the cache; its mtime is refreshed to mark it as used."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _write_cache(path, data):
+    """Write atomically, so an interrupted export never leaves a partial piece behind."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _ends_piece(artefact_id, average):
+    """True for about one artefact id in `average`, the same ids in every export."""
+    digest = hashlib.blake2b(str(artefact_id).encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % average == 0
+
+
+def _pieces(items, artefact_id, average):
+    """
+    Split items into cached pieces of about `average` items, ending after
+    the items whose artefact_id(item) _ends_piece (pieces are kept between
+    average // 4 and 4 * average items long).
+    """
+    piece = []
+    for item in items:
+        piece.append(item)
+        if len(piece) >= 4 * average or (
+                len(piece) >= average // 4 and _ends_piece(artefact_id(item), average)):
+            yield piece
+            piece = []
+    if piece:
+        yield piece
+
+
+def _prune_cache(kind):
+    """Delete pieces of this kind that were not used for EXPORT_CACHE_DAYS."""
+    directory = os.path.join(EXPORT_CACHE_DIR, kind)
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - EXPORT_CACHE_DAYS * 24 * 3600
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass  # e.g. removed by a concurrent export
+
 
 # ---------------- EXCEL EXPORT ----------------
-def export_to_excel(filename):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Artefacts"
-
-    # Headers
-    for col, header in enumerate(HEADERS, start=1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    # Data
-    rows = get_all_artefacts()
-    for row_idx, row in enumerate(rows, start=2):
-        for col_idx, value in enumerate(row, start=1):
-            text = str(value) if value else ""
-            wrap = True if " " in text else False
-            cell = ws.cell(row=row_idx, column=col_idx, value=text)
-            cell.alignment = Alignment(wrap_text=wrap, vertical="top")
-
-    # ---------------- MANUAL COLUMN WIDTHS ----------------
-    manual_widths = {
-        "ID": 5,
-        "კოდი": 12,
-        "ნივთი": 20,
-        "კატეგორია": 18,
-        "აღმოჩენის ადგილი": 25,
-        "აღწერა": 30,
-        "პერიოდი": 15,
-        "მდებარეობა": 20,
-        "მდგომარეობა": 18,
-        "სტატუსი": 18,
-        "კურატორი": 20,
-        "თარიღი": 11
-    }
+# Average rows per cached block of sheet XML
+EXCEL_BLOCK_SIZE = 1000
+
+# The worksheet inside the .xlsx
+EXCEL_SHEET_PART = "xl/worksheets/sheet1.xml"
+
+# Column widths in Excel character units
+COLUMN_WIDTHS = {
+    "ID": 5,
+    "კოდი": 12,
+    "ნივთი": 20,
+    "კატეგორია": 18,
+    "აღმოჩენის ადგილი": 25,
+    "აღწერა": 30,
+    "პერიოდი": 15,
+    "მდებარეობა": 20,
+    "მდგომარეობა": 18,
+    "სტატუსი": 18,
+    "კურატორი": 20,
+    "თარიღი": 11
+}
+
+
+def _row_height(texts):
+    """Estimated row height in points: wrapped cells get ~20 characters per 15pt line."""
+    height = 15
+    for text in texts:
+        if " " in text:
+            height = max(height, (len(text) // 20 + 1) * 15)
+    return height
+
+
+def _row_xml(texts, styles):
+    """
+    One worksheet <row> as openpyxl's write-only mode would write it, but
+    without the optional r= references: rows and cells then follow on from
+    the previous ones, so a block's XML is the same wherever it lands.
+    styles maps "wraps" (True/False) to the cell style id.
+    """
+    cells = []
+    for text in texts:
+        style = styles[" " in text]
+        text = ILLEGAL_CHARACTERS_RE.sub("", text)
+        if text:
+            # Like openpyxl: otherwise Excel drops leading/trailing whitespace
+            space = ' xml:space="preserve"' if text != text.strip() else ""
+            cells.append(f'<c s="{style}" t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>')
+        else:
+            cells.append(f'<c s="{style}" />')
+    return f'<row ht="{_row_height(texts)}" customHeight="1">{"".join(cells)}</row>'
+
 
+def export_to_excel(filename, text="", category=None, status=None, sort="id", descending=False):
+    """
+    Stream the artefacts matching the filters (all of them by default) into
+    filename, in the given order. openpyxl writes the workbook around
+    the data (styles, widths, header); the data rows are added to the sheet
+    in blocks of about EXCEL_BLOCK_SIZE, each taken from the export cache
+    when its rows are unchanged since an earlier export.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Artefacts")
+
+    # Widths must be set before the first row is written
     for col_idx, header in enumerate(HEADERS, start=1):
-        col_letter = get_column_letter(col_idx)
-        ws.column_dimensions[col_letter].width = manual_widths.get(header, 15)
-
-    # ---------------- ROW HEIGHTS ----------------
-    for row_idx in range(2, ws.max_row + 1):
-        max_height = 15
-        for col_idx in range(1, ws.max_column + 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            if cell.value:
-                text = str(cell.value)
-                if " " in text:
-                    est_lines = (len(text) // 20) + 1  # rough estimate for line breaks
-                    height = est_lines * 15
-                    max_height = max(max_height, height)
-        ws.row_dimensions[row_idx].height = max_height
-
-    wb.save(filename)
+        ws.column_dimensions[get_column_letter(col_idx)].width = COLUMN_WIDTHS.get(header, 15)
+
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    header_cells = []
+    for header in HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # Registers both data styles with the workbook
+    wrapped = WriteOnlyCell(ws)
+    wrapped.alignment = Alignment(wrap_text=True, vertical="top")
+    unwrapped = WriteOnlyCell(ws)
+    unwrapped.alignment = Alignment(wrap_text=False, vertical="top")
+    styles = {True: wrapped.style_id, False: unwrapped.style_id}
+
+    with tempfile.TemporaryDirectory(prefix="gem_xlsx_") as tmp_dir:
+        skeleton = os.path.join(tmp_dir, "skeleton.xlsx")
+        wb.save(skeleton)
+
+        with zipfile.ZipFile(skeleton) as src, \
+                zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED) as out:
+            for item in src.infolist():
+                if item.filename != EXCEL_SHEET_PART:
+                    out.writestr(item, src.read(item))
+                    continue
+                head, tail = src.read(item).split(b"</sheetData>")
+                with out.open(EXCEL_SHEET_PART, "w", force_zip64=True) as sheet:
+                    sheet.write(head)
+                    rows = (
+                        [str(value) if value else "" for value in row]
+                        for row in get_export_rows(text, category, status, sort, descending)
+                    )
+                    for block in _pieces(rows, lambda texts: int(texts[0]), EXCEL_BLOCK_SIZE):
+                        sheet.write(_excel_block(block, styles))
+                    sheet.write(b"</sheetData>" + tail)
+
+    _prune_cache("xlsx")
     print(f"✅ Exported to Excel: {filename}")
 
 
+def _excel_block(rows, styles):
+    """Sheet XML of rows, from the cache if possible."""
+    path = _cache_path("xlsx", _cache_key(styles[True], styles[False], rows), ".xml")
+    if _cached(path):
+        with open(path, "rb") as f:
+            return f.read()
+    data = "".join(_row_xml(texts, styles) for texts in rows).encode("utf-8")
+    _write_cache(path, data)
+    return data
+
+
 # ---------------- PDF EXPORT ----------------
-def export_to_pdf(filename):
+# The catalogue is rendered in chunks of about PDF_CHUNK_SIZE artefacts,
+# each its own small PDF built by a worker process (or taken from the
+# export cache), and the chunks are then joined object by object into the
+# output file. Only a few chunks are in flight at once, so memory does not
+# grow with the collection. Every chunk starts on a new page, so a chunk
+# with an odd count ends with a page holding one artefact.
+
+# Average artefacts per chunk (two per page, so keep it even)
+PDF_CHUNK_SIZE = 200
+
+# Print resolution of the photos
+PDF_IMAGE_DPI = 200
+
+PDF_TABLE_WIDTH = A4[0] - 60
+
+# Box the photo is fitted into, in points: 90% of the photo column and row
+PDF_PHOTO_BOX = (PDF_TABLE_WIDTH * 0.3 * 0.9, 180 * 0.9)
+
+# Longest side of the embedded photos in px (450: the box at PDF_IMAGE_DPI,
+# which is also a precomputed thumbnail size, so usually nothing is resampled)
+PDF_PHOTO_PX = math.ceil(max(PDF_PHOTO_BOX) / 72 * PDF_IMAGE_DPI)
+
+PDF_LABELS = (
+    "კოდი", "ნივთი", "კატეგორია", "აღმოჩენის ადგილი", "პერიოდი",
+    "მდებარეობა", "მდგომარეობა", "სტატუსი", "აღწერა",
+)
+
+
+def _pdf_values(artefact):
+    """The artefact's values in PDF_LABELS order."""
+    return (
+        artefact.artefact_code, artefact.name, artefact.category, artefact.origin,
+        artefact.period, artefact.location, artefact.condition, artefact.status,
+        artefact.description or "",
+    )
+
+
+def _pdf_photo(image, tmp_dir):
+    """Image flowable of the photo at image, at print resolution, or None."""
+    source = get_thumbnail(image, PDF_PHOTO_PX) if image else None
+    if not source or not os.path.exists(source):
+        return None
+    # ReportLab only reads the header of a JPEG given by path (bytes get decoded)
+    path = print_copy(source, PDF_PHOTO_PX, os.path.join(tmp_dir, os.path.basename(image)))
+    if path is None:
+        return None
+    try:
+        img_obj = Image(path)
+    except Exception:
+        return None
+    orig_width, orig_height = img_obj.imageWidth, img_obj.imageHeight
+    scale = min(PDF_PHOTO_BOX[0] / orig_width, PDF_PHOTO_BOX[1] / orig_height)
+    img_obj.drawWidth = orig_width * scale
+    img_obj.drawHeight = orig_height * scale
+    img_obj.hAlign = "CENTER"
+    return img_obj
+
+
+def _pdf_table(values, image, tmp_dir):
+    """One artefact's catalogue entry: label / value rows with the photo alongside."""
+    # Labels are bold, values regular
+    table_data = [
+        [Paragraph(label, label_style), Paragraph(str(value) if value else "", value_style), ""]
+        for label, value in zip(PDF_LABELS, values)
+    ]
+    row_heights = [32] * (len(PDF_LABELS) - 1) + [64]  # description gets two
+
+    # --- PHOTO header ---
+    table_data[0][2] = Paragraph("<b>ფოტო</b>", label_style)
+
+    img_obj = _pdf_photo(image, tmp_dir)
+    if img_obj:
+        table_data[1][2] = img_obj
+
+    table = Table(
+        table_data,
+        colWidths=[PDF_TABLE_WIDTH * 0.25, PDF_TABLE_WIDTH * 0.45, PDF_TABLE_WIDTH * 0.3],
+        rowHeights=row_heights,
+    )
+
+    # --- Table style ---
+    style = [
+        ("GRID", (0, 0), (-1, -1), 0.8, colors.black),
+        # Center all label cells (col 0)
+        ("ALIGN", (0, 0), (0, len(table_data)-1), "CENTER"),
+        ("VALIGN", (0, 0), (0, len(table_data)-1), "MIDDLE"),
+        # Center PHOTO header
+        ("ALIGN", (2, 0), (2, 0), "CENTER"),
+        ("VALIGN", (2, 0), (2, 0), "MIDDLE"),
+        # Center image (col 2, all rows except header)
+        ("ALIGN", (2, 1), (2, len(table_data)-2), "CENTER"),
+        ("VALIGN", (2, 1), (2, len(table_data)-2), "MIDDLE"),
+        # Merge image column
+        ("SPAN", (2, 1), (2, len(table_data)-2)),
+        # Merge description across 2nd+3rd columns
+        ("SPAN", (1, 8), (2, 8)),
+        # Value cells (col 1) left-aligned, top-aligned
+        ("ALIGN", (1, 0), (1, len(table_data)-1), "LEFT"),
+        ("VALIGN", (1, 0), (1, len(table_data)-2), "MIDDLE"),
+        ("VALIGN", (1, 8), (1, 8), "TOP"),  # description value top-aligned
+    ]
+
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def _render_pdf_chunk(filename, entries):
+    """Build the PDF for one chunk of (values, image path) entries (runs in a worker process)."""
     doc = SimpleDocTemplate(filename, pagesize=A4,
                             rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    elements = []
-
-    artefacts = get_all_artefacts()
-    page_width, page_height = A4
-    table_width = page_width - 60
-
-    def build_table(artefact):
-        artefact_id = artefact[0]
-        description = artefact[5] or ""
-        images = get_images(artefact_id)
-
-        fields = [
-            ("კოდი", artefact[1]),
-            ("ნივთი", artefact[2]),
-            ("კატეგორია", artefact[3]),
-            ("აღმოჩენის ადგილი", artefact[4]),
-            ("პერიოდი", artefact[6]),
-            ("მდებარეობა", artefact[7]),
-            ("მდგომარეობა", artefact[8]),
-            ("სტატუსი", artefact[9]),
-            ("აღწერა", description),
-        ]
-
-        # --- Prepare table data ---
-        table_data = []
-        for label, value in fields:
-            # Labels are bold
-            label_para = Paragraph(label, label_style)
-            # Values are regular (non-bold)
-            value_para = Paragraph(str(value) if value else "", value_style)
-            
-            # For description, use value_style
-            if label == "აღწერა":
-                row = [label_para, value_para, ""]
-            else:
-                row = [label_para, value_para, ""]
-            
-            table_data.append(row)
-
-        # --- Row heights ---
-        row_heights = []
-        for label, _ in fields:
-            row_heights.append(32 if label != "აღწერა" else 64)
-
-
-        # --- PHOTO header ---
-        table_data[0][2] = Paragraph("<b>ფოტო</b>", label_style)
-
-        # --- Image ---
-        img_obj = None
-        if images and os.path.exists(images[0]):
-            try:
-                img_obj = Image(images[0])
-                orig_width, orig_height = img_obj.imageWidth, img_obj.imageHeight
-                
-                # reserve 10% padding on all sides
-                reserved_width = table_width * 0.3 * 0.9  # 90% of column width
-                reserved_height = 180 * 0.9              # 90% of row height
-                
-                scale = min(reserved_width / orig_width, reserved_height / orig_height)
-                img_obj.drawWidth = orig_width * scale
-                img_obj.drawHeight = orig_height * scale
-                img_obj.hAlign = "CENTER"
-            except:
-                img_obj = None
-
-        if img_obj:
-            table_data[1][2] = img_obj
-
-
-
-        # --- Create table ---
-        table = Table(
-            table_data,
-            colWidths=[table_width * 0.25, table_width * 0.45, table_width * 0.3],
-            rowHeights=row_heights,
-        )
-        
-        # --- Table style ---
-        style = [
-            ("GRID", (0, 0), (-1, -1), 0.8, colors.black),
-            # Center all label cells (col 0)
-            ("ALIGN", (0, 0), (0, len(table_data)-1), "CENTER"),
-            ("VALIGN", (0, 0), (0, len(table_data)-1), "MIDDLE"),
-            # Center PHOTO header
-            ("ALIGN", (2, 0), (2, 0), "CENTER"),
-            ("VALIGN", (2, 0), (2, 0), "MIDDLE"),
-            # Center image (col 2, all rows except header)
-            ("ALIGN", (2, 1), (2, len(table_data)-2), "CENTER"),
-            ("VALIGN", (2, 1), (2, len(table_data)-2), "MIDDLE"),
-            # Merge image column
-            ("SPAN", (2, 1), (2, len(table_data)-2)),
-            # Merge description across 2nd+3rd columns
-            ("SPAN", (1, 8), (2, 8)),
-            # Value cells (col 1) left-aligned, top-aligned
-            ("ALIGN", (1, 0), (1, len(table_data)-1), "LEFT"),
-            ("VALIGN", (1, 0), (1, len(table_data)-2), "MIDDLE"),
-            ("VALIGN", (1, 8), (1, 8), "TOP"),  # description value top-aligned
-        ]
-
-        table.setStyle(TableStyle(style))
-        return table
-
-    # --- Build PDF ---
-    for i, artefact in enumerate(artefacts):
-        table = build_table(artefact)
-        elements.append(table)
-        elements.append(Spacer(1, 40))
-        if i % 2 == 1:
-            elements.append(PageBreak())
-
-    doc.build(elements)
-    print(f"✅ Exported to PDF: {filename}")
\ No newline at end of file
+    # Photos without a small enough thumbnail are resampled into here
+    with tempfile.TemporaryDirectory(prefix="gem_pdf_") as tmp_dir:
+        elements = []
+        for i, (values, image) in enumerate(entries):
+            elements.append(_pdf_table(values, image, tmp_dir))
+            elements.append(Spacer(1, 40))
+            if i % 2 == 1 and i < len(entries) - 1:
+                elements.append(PageBreak())
+        doc.build(elements)
+    return filename
+
+
+def _renumber_refs(obj, renumber):
+    """Point every indirect reference inside obj at renumber(reference), in place."""
+    if isinstance(obj, IndirectObject):
+        return IndirectObject(renumber(obj), 0, None)
+    if isinstance(obj, DictionaryObject):  # streams included
+        for key, value in dict.items(obj):
+            dict.__setitem__(obj, key, _renumber_refs(value, renumber))
+    elif isinstance(obj, ArrayObject):
+        for i, value in enumerate(obj):
+            obj[i] = _renumber_refs(value, renumber)
+    return obj
+
+
+def _join_pdfs(chunk_files, filename):
+    """
+    Write the pages of chunk_files, in order, as one PDF. Each chunk's
+    objects are renumbered and written straight out, so only one chunk is
+    in memory at a time (pypdf's PdfWriter would hold the whole output).
+    """
+    # Objects 1 and 2 are the catalog and page tree, written last
+    offsets = [None, None]
+    kids = []
+    with open(filename, "wb") as out:
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for chunk_file in chunk_files:
+            reader = PdfReader(chunk_file)
+            numbers = {}
+            queue = []
+
+            def renumber(ref):
+                if ref.idnum not in numbers:
+                    offsets.append(None)
+                    numbers[ref.idnum] = len(offsets)
+                    queue.append(ref)
+                return numbers[ref.idnum]
+
+            for page in reader.pages:
+                kids.append(renumber(page.indirect_reference))
+            while queue:
+                ref = queue.pop()
+                obj = reader.get_object(ref)
+                is_page = isinstance(obj, DictionaryObject) and obj.get("/Type") == "/Page"
+                if is_page:
+                    del obj["/Parent"]  # the chunk's page tree is not copied
+                _renumber_refs(obj, renumber)
+                if is_page:
+                    obj[NameObject("/Parent")] = IndirectObject(2, 0, None)
+                number = numbers[ref.idnum]
+                offsets[number - 1] = out.tell()
+                out.write(f"{number} 0 obj\n".encode())
+                obj.write_to_stream(out)
+                out.write(b"\nendobj\n")
+
+        offsets[0] = out.tell()
+        out.write(b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+        offsets[1] = out.tell()
+        kid_refs = " ".join(f"{number} 0 R" for number in kids)
+        out.write(f"2 0 obj\n<< /Type /Pages /Count {len(kids)} /Kids [{kid_refs}] >>\nendobj\n".encode())
+
+        xref = out.tell()
+        out.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        out.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode())
+        out.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\n"
+                  f"startxref\n{xref}\n%%EOF\n".encode())
+
+
+def _pdf_chunk_key(entries):
+    # Photos are stored under their content hash, so the file name stands for the photo
+    return _cache_key(PDF_IMAGE_DPI, [
+        (values, os.path.basename(image) if image else None) for values, image in entries
+    ])
+
+
+def export_to_pdf(filename, text="", category=None, status=None, sort="id", descending=False,
+                  workers=None):
+    """
+    Write the catalogue of the artefacts matching the filters (all of them
+    by default) to filename, in the given order. Chunks not in the export
+    cache are rendered on `workers` processes (all cores by default).
+    """
+    filtered = text or category or status
+    first_images = get_first_image_map(search_ids(text, category, status) if filtered else None)
+    workers = workers or os.cpu_count() or 1
+    artefacts = iter_artefacts(sort=sort, descending=descending,
+                               text=text, category=category, status=status)
+    entries = ((artefact.id, _pdf_values(artefact), first_images.get(artefact.id)) for artefact in artefacts)
+
+    chunk_files, pending = [], {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def finish(done):
+            for future in done:
+                tmp_path, chunk_file = pending.pop(future)
+                future.result()
+                os.replace(tmp_path, chunk_file)
+
+        for piece in _pieces(entries, lambda entry: entry[0], PDF_CHUNK_SIZE):
+            chunk = [(values, image) for _, values, image in piece]
+            chunk_file = _cache_path("pdf", _pdf_chunk_key(chunk), ".pdf")
+            chunk_files.append(chunk_file)
+            if _cached(chunk_file):
+                continue
+            if len(pending) >= 2 * workers:
+                finish(wait(pending, return_when=FIRST_COMPLETED)[0])
+            tmp_path = f"{chunk_file}.{uuid.uuid4().hex}.tmp"
+            pending[pool.submit(_render_pdf_chunk, tmp_path, chunk)] = (tmp_path, chunk_file)
+        finish(list(pending))
+
+    if not chunk_files:
+        SimpleDocTemplate(filename, pagesize=A4).build([])  # empty collection
+    else:
+        _join_pdfs(chunk_files, filename)
+
+    _prune_cache("pdf")
+    print(f"✅ Exported to PDF: {filename}")
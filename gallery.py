@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
-from database import get_images
+from database import get_images, get_thumbnail
 
 class ImageGallery(QDialog):
     def __init__(self, artefact_id):
@@ -39,7 +39,7 @@ class ImageGallery(QDialog):
 
     def show_image(self, index):
         if 0 <= index < len(self.images):
-            pixmap = QPixmap(self.images[index])
+            pixmap = QPixmap(get_thumbnail(self.images[index], 800))
             if not pixmap.isNull():
                 self.image_label.setPixmap(pixmap.scaled(750, 550, aspectRatioMode=True))
             else:
@@ -0,0 +1,120 @@
+import os
+import shutil
+import hashlib
+import uuid
+from PIL import Image
+
+# -------------------------
+# Photo processing
+# -------------------------
+# Pure Pillow helpers with no database or Qt imports, so they can run in
+# worker processes.
+
+# Longest side of the stored master JPEG
+MASTER_SIZE = 1600
+
+# Longest side of each precomputed derivative:
+# 64 = form icons, 150 = table previews, 450 = PDF catalogue, 800 = gallery
+THUMBNAIL_SIZES = (64, 150, 450, 800)
+
+
+def _temp_path(dest_path):
+    # Unique per writer, so concurrent ingestion of the same photo can't collide
+    return f"{dest_path}.{uuid.uuid4().hex}.tmp"
+
+
+def _save_jpeg(img, dest_path, quality):
+    """Write atomically, so a crash never leaves a half-written JPEG behind."""
+    tmp_path = _temp_path(dest_path)
+    img.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    os.replace(tmp_path, dest_path)
+
+
+def file_hash(path):
+    """SHA-256 of a file's bytes, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compress_photo(src_path, dest_path):
+    """
+    Store src_path as the master JPEG at dest_path (max 1600px, quality 70).
+    Falls back to a plain copy if Pillow can't read the file.
+    """
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    try:
+        img = Image.open(src_path)
+        max_size = (MASTER_SIZE, MASTER_SIZE)
+        # JPEG draft mode: let libjpeg decode big camera files at 1/2, 1/4 or
+        # 1/8 scale (never below max_size) before the LANCZOS pass
+        img.draft("RGB", max_size)
+        if img.mode in ("RGBA", "P"):
+            img = img.convert("RGB")
+
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        _save_jpeg(img, dest_path, quality=70)
+
+    except Exception as e:
+        print(f"⚠ Image processing failed, copying original: {e}")
+        tmp_path = _temp_path(dest_path)
+        shutil.copy2(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    return dest_path
+
+
+def ingest_photo(src_path, dest_path, thumbnail_targets):
+    """Store one photo and its derivatives (the unit of work for a process pool)."""
+    compress_photo(src_path, dest_path)
+    make_thumbnails(dest_path, thumbnail_targets)
+    return dest_path
+
+
+def make_thumbnails(master_path, targets):
+    """
+    Write downscaled copies of master_path. targets maps longest side in px
+    to destination path. Each size is derived from the next larger one,
+    so the master is decoded once. Returns the paths written.
+    """
+    written = []
+    try:
+        img = Image.open(master_path)
+        img.draft("RGB", (max(targets), max(targets)))  # JPEG: decode at reduced scale
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        for size in sorted(targets, reverse=True):
+            img.thumbnail((size, size), Image.Resampling.LANCZOS)
+            dest_path = targets[size]
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            _save_jpeg(img, dest_path, quality=80)
+            written.append(dest_path)
+
+    except Exception as e:
+        print(f"⚠ Could not create thumbnails for {master_path}: {e}")
+    return written
+
+
+def print_copy(src_path, size, dest_path):
+    """
+    Path of a JPEG of src_path with its longest side at most `size` px, for
+    embedding at print resolution: src_path itself when it already is one,
+    otherwise a resampled copy written to dest_path. None if Pillow can't
+    read the file.
+    """
+    try:
+        img = Image.open(src_path)
+        if img.format == "JPEG" and max(img.size) <= size:
+            return src_path
+        img.draft("RGB", (size, size))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        img.save(dest_path, "JPEG", quality=80, optimize=True)
+        return dest_path
+    except Exception as e:
+        print(f"⚠ Could not resample {src_path}: {e}")
+        return None
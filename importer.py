@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+from datetime import date, datetime
+
+import openpyxl
+
+from database import (
+    EDITABLE_COLUMNS, get_connection, transaction, deferred_search_index, ingest_photos, link_image
+)
+from exporter import HEADERS, EXPORT_COLUMNS
+
+# -------------------------
+# Bulk import
+# -------------------------
+# Reads inventory spreadsheets laid out like export_to_excel writes them
+# (same header row; the ID column is ignored, new ids are assigned).
+# Rows are streamed, never loaded whole, and inserted with executemany in
+# one transaction. Codes already in the DB, or repeated in the file, are
+# skipped. Photos named after a code (CODE.jpg, CODE_1.jpg, ...) can be
+# attached from a folder.
+
+# Rows per executemany call
+BATCH_SIZE = 5000
+
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Header text -> artefacts column: the exporter's headers or the raw column names
+COLUMN_FOR_HEADER = dict(zip(HEADERS, EXPORT_COLUMNS))
+COLUMN_FOR_HEADER.update({column: column for column in EXPORT_COLUMNS})
+
+# Columns filled from the file, in INSERT order
+IMPORT_COLUMNS = EDITABLE_COLUMNS + ("date_added",)
+
+INSERT_SQL = f"""
+    INSERT INTO artefacts ({", ".join(IMPORT_COLUMNS)})
+    VALUES ({", ".join("?" * len(EDITABLE_COLUMNS))}, COALESCE(?, DATE('now')))
+"""
+
+
+def _cell_text(value):
+    """Spreadsheet cell -> the string the form would have stored."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # Excel turns codes like 1024 into 1024.0
+    return str(value).strip()
+
+
+def _sheet_rows(path):
+    """Raw rows of the first sheet (xlsx) or of a UTF-8 CSV, header first."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.reader(f)
+        return
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def read_rows(path):
+    """
+    Yield one tuple of IMPORT_COLUMNS values per data row of path.
+    date_added is None when the file has no date for the row.
+    """
+    rows = _sheet_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    positions = {}
+    for index, title in enumerate(header):
+        column = COLUMN_FOR_HEADER.get(_cell_text(title))
+        if column in IMPORT_COLUMNS:
+            positions[column] = index
+    if "artefact_code" not in positions:
+        raise ValueError(f"სვეტი '{HEADERS[1]}' ვერ მოიძებნა ფაილში.")
+
+    slots = [positions.get(column) for column in IMPORT_COLUMNS]
+    for row in rows:
+        values = [_cell_text(row[i]) if i is not None and i < len(row) else "" for i in slots]
+        if not any(values):
+            continue  # blank line
+        values[-1] = values[-1] or None
+        yield tuple(values)
+
+
+def match_photos(photos_dir, codes):
+    """{code: [paths]} for files in photos_dir named CODE.ext or CODE_N.ext, in N order."""
+    matches = {}
+    for root, _, files in os.walk(photos_dir):
+        for name in files:
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in PHOTO_EXTENSIONS:
+                continue
+            code, number = stem, 0
+            if code not in codes:
+                base, _, suffix = stem.rpartition("_")
+                if base not in codes or not suffix.isdigit():
+                    continue
+                code, number = base, int(suffix)
+            matches.setdefault(code, []).append((number, os.path.join(root, name)))
+    return {code: [path for _, path in sorted(found)] for code, found in matches.items()}
+
+
+def import_artefacts(path, photos_dir=None, progress=None):
+    """
+    Import artefacts from an .xlsx or .csv file, then attach matching photos
+    from photos_dir (processed in the photo pool). progress(stage, done,
+    total) reports stage "rows" (total 0: unknown) and then "photos".
+    Returns (rows inserted, codes skipped, photos attached).
+    """
+    # One read instead of an artefact_code_exists query per row
+    existing = {row[0] for row in get_connection().execute("SELECT artefact_code FROM artefacts")}
+    added, skipped, batch = set(), [], []
+
+    with transaction() as cur, deferred_search_index(cur):
+        for values in read_rows(path):
+            code = values[0]
+            if not code or code in existing:
+                skipped.append(code)
+                continue
+            existing.add(code)
+            added.add(code)
+            batch.append(values)
+            if len(batch) == BATCH_SIZE:
+                cur.executemany(INSERT_SQL, batch)
+                batch = []
+                if progress:
+                    progress("rows", len(added), 0)
+        if batch:
+            cur.executemany(INSERT_SQL, batch)
+    if progress:
+        progress("rows", len(added), len(added))
+
+    photos = 0
+    if photos_dir and added:
+        matches = match_photos(photos_dir, added)
+        sources = [(code, src) for code, paths in matches.items() for src in paths]
+        if sources:
+            stored = ingest_photos(
+                [src for _, src in sources],
+                progress=(lambda done, total: progress("photos", done, total)) if progress else None,
+            )
+            ids = dict(get_connection().execute(
+                "SELECT artefact_code, id FROM artefacts WHERE artefact_code IN "
+                "(SELECT value FROM json_each(?))",
+                (json.dumps(list(matches)),),
+            ))
+            with transaction():
+                for (code, _), (filename, content_hash) in zip(sources, stored):
+                    link_image(ids[code], filename, content_hash)
+            photos = len(stored)
+
+    print(f"📥 Imported {len(added)} artefacts ({len(skipped)} skipped), {photos} photos from {path}")
+    return len(added), skipped, photos
@@ -1,21 +1,24 @@
 import sys
-import os
+import multiprocessing
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QPushButton, QFileDialog,
+    QApplication, QMainWindow, QTableView, QPushButton, QFileDialog, QAbstractItemView,
     QVBoxLayout, QWidget, QLineEdit, QLabel, QHBoxLayout, QComboBox, QDialog, QHeaderView,
-    QMessageBox
+    QMessageBox, QProgressDialog
 )
-import sqlite3
 import database
-from artefact_form import ArtefactForm
+from artefact_form import ArtefactForm, BulkEditDialog
+from artefact_table import ArtefactTableModel, ThumbnailDelegate, PHOTO_COLUMN, ROW_HEIGHT
+from query_engine import QueryEngine
 from PyQt5.QtCore import Qt
-from database import CATEGORIES, STATUS_OPTIONS, get_images, artefact_code_exists
+from database import CATEGORIES, STATUS_OPTIONS
 from gallery import ImageGallery
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtGui import QIcon
 from users import LoginDialog, init_users_table, users_exist, create_first_admin, ManageUsersDialog
 from users import ROLE_TRANSLATIONS
 from backup import backup_database_and_photos, sync_from_drive
+from photo_gc import collect_garbage, purge_trash_in_background
 from exporter import export_to_excel, export_to_pdf
+from importer import import_artefacts
 from updater import check_for_updates
 
 
@@ -44,7 +47,7 @@ class MainWindow(QMainWindow):
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("არტეფაქტის ძებნა...")
-        self.search_input.textChanged.connect(self.apply_filters)
+        self.search_input.textChanged.connect(lambda _text: self.apply_filters())
         search_layout.addWidget(QLabel("ძებნა:"))
         search_layout.addWidget(self.search_input)
 
@@ -52,12 +55,12 @@ class MainWindow(QMainWindow):
         self.category_filter = QComboBox()
         self.category_filter.addItem("ყველა კატეგორია")
         self.category_filter.addItems(CATEGORIES)
-        self.category_filter.currentIndexChanged.connect(self.apply_filters)
+        self.category_filter.currentIndexChanged.connect(lambda _index: self.apply_filters(immediate=True))
 
         self.status_filter = QComboBox()
         self.status_filter.addItem("ყველა სტატუსი")
         self.status_filter.addItems(STATUS_OPTIONS)
-        self.status_filter.currentIndexChanged.connect(self.apply_filters)
+        self.status_filter.currentIndexChanged.connect(lambda _index: self.apply_filters(immediate=True))
 
         search_layout.addWidget(QLabel("კატეგორია:"))
         search_layout.addWidget(self.category_filter)
@@ -66,24 +69,45 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(search_layout)
 
-        # Artefact table
-        self.table = QTableWidget()
+        # Artefact table (rows are fetched lazily, previews painted by a delegate)
+        self.model = ArtefactTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)  # Ctrl/Shift for bulk edit
+        self.table.setItemDelegateForColumn(PHOTO_COLUMN, ThumbnailDelegate(self.table))
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
         layout.addWidget(self.table)
-        self.table.cellDoubleClicked.connect(self.open_gallery)
+        self.table.doubleClicked.connect(self.open_gallery)
+
+        # Clicking a header sorts in SQL (see database.iter_artefacts)
+        header = self.table.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.setSortIndicator(0, Qt.AscendingOrder)
+        header.setSortIndicatorShown(True)
+        header.sortIndicatorChanged.connect(lambda _section, _order: self.apply_filters(immediate=True))
+
+        # Filter changes are searched off the GUI thread (see query_engine)
+        self.query_engine = QueryEngine(self)
+        self.query_engine.results_ready.connect(self.show_results)
 
         # Artefact buttons
         self.add_button = QPushButton("არტეფაქტის დამატება")
         self.edit_button = QPushButton("არტეფაქტის რედაქტირება")
+        self.bulk_edit_button = QPushButton("არჩეულების ჯგუფური რედაქტირება")
         self.delete_button = QPushButton("არტეფაქტის წაშლა")
         self.clear_filters_button = QPushButton("ფილტრების გასუფთავება")
 
         self.add_button.clicked.connect(self.add_artefact)
         self.edit_button.clicked.connect(self.edit_artefact)
+        self.bulk_edit_button.clicked.connect(self.bulk_edit_artefacts)
         self.delete_button.clicked.connect(self.delete_artefact)
         self.clear_filters_button.clicked.connect(self.clear_filters)
 
         layout.addWidget(self.add_button)
         layout.addWidget(self.edit_button)
+        layout.addWidget(self.bulk_edit_button)
         layout.addWidget(self.delete_button)
         layout.addWidget(self.clear_filters_button)
 
@@ -91,6 +115,7 @@ class MainWindow(QMainWindow):
         if self.current_user_role == "viewer":
             self.add_button.setEnabled(False)
             self.edit_button.setEnabled(False)
+            self.bulk_edit_button.setEnabled(False)
             self.delete_button.setEnabled(False)
 
         # Admin-only: "Manage Users" + Backup/Sync
@@ -106,6 +131,10 @@ class MainWindow(QMainWindow):
             top_bar_layout.addWidget(self.backup_button)
             top_bar_layout.addWidget(self.sync_button)
 
+            self.cleanup_button = QPushButton("ფოტოების გასუფთავება")
+            self.cleanup_button.clicked.connect(self.cleanup_photos)
+            top_bar_layout.addWidget(self.cleanup_button)
+
 
         # Export buttons (Excel, PDF) for admin and curator
         if self.current_user_role in ["admin", "curator"]:
@@ -118,6 +147,10 @@ class MainWindow(QMainWindow):
             layout.addWidget(self.export_excel_btn)
             layout.addWidget(self.export_pdf_btn)
 
+            self.import_btn = QPushButton("იმპორტი Excel/CSV-დან")
+            self.import_btn.clicked.connect(self.import_file)
+            layout.addWidget(self.import_btn)
+
         # Update button
         self.update_button = QPushButton("განახლების შემოწმება")
         self.update_button.clicked.connect(lambda: check_for_updates(self))
@@ -139,148 +172,112 @@ class MainWindow(QMainWindow):
 
     # ---------------- Artefacts ----------------
     def load_data(self):
-        artefacts = database.get_artefacts()
-        self.table.setRowCount(len(artefacts))
-        self.table.setColumnCount(13)
         self.set_wrapped_headers()
-
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.Stretch)
-
-        for row_idx, row_data in enumerate(artefacts):
-            for col_idx, value in enumerate(row_data):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)  # read-only
-                self.table.setItem(row_idx, col_idx, item)
-
-            # Image preview
-            images = get_images(row_data[0])
-            if images and os.path.exists(images[0]):
-                pixmap = QPixmap(images[0]).scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                label = QLabel()
-                label.setPixmap(pixmap)
-                label.setAlignment(Qt.AlignCenter)
-                self.table.setCellWidget(row_idx, 12, label)
-                self.table.setRowHeight(row_idx, 160)
-            else:
-                placeholder = QPixmap("assets/placeholder.png").scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                label = QLabel()
-                label.setPixmap(placeholder)
-                label.setAlignment(Qt.AlignCenter)
-                self.table.setCellWidget(row_idx, 12, label)
-                self.table.setRowHeight(row_idx, 160)
-
+        self.query_engine.cancel()
+        self.query_engine.invalidate()
+        self.change_seq = database.latest_change_seq()
+        sort, descending = self.current_sort()
+        self.model.set_query(sort=sort, descending=descending)
+
+    def refresh_changes(self):
+        """Apply only the rows changed since the last refresh (see database.changes_since)."""
+        changes = database.changes_since(self.change_seq)
+        if changes:
+            self.change_seq = changes[-1][0]
+            self.model.refresh_rows({artefact_id for _, _, _, artefact_id, _ in changes})
+            self.query_engine.invalidate()
+
+    def show_results(self, query, ids, seq):
+        """Show a query_engine result, then catch up with anything changed since it was read."""
+        self.change_seq = seq
+        self.model.set_result(query, ids)
+        self.refresh_changes()
+
+    def selected_artefact_id(self):
+        """ID of the artefact in the current table row, or None."""
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return None
+        return self.model.artefact_id(index.row())
+
+    def selected_artefact_ids(self):
+        """IDs of every selected table row, in table order."""
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        return [self.model.artefact_id(row) for row in rows]
 
     def add_artefact(self):
         dialog = ArtefactForm()
         if dialog.exec_():
-            artefact = list(dialog.get_data())
-            images = artefact.pop()  # separate images
-            artefact_code = artefact[0]
-
-            if not artefact_code.strip():
-                QMessageBox.warning(self, "გაფრთხილება", "გთხოვთ შეიყვანოთ კოდი არტეფაქტისთვის.")
-                return
-
-            # Check duplicate codes
-            if database.artefact_code_exists(artefact_code):
-                QMessageBox.warning(self, "გაფრთხილება", f"კოდი '{artefact_code}' უკვე გამოიყენება სხვა არტეფაქტში.")
-                return
-
-            database.add_artefact(artefact)
-            new_id = database.get_artefacts()[-1][0]
-            for img in images:
-                database.add_image(new_id, img)
-            self.load_data()
+            artefact, images = dialog.get_data()
+            if self.save_artefact(artefact, images) is not None:
+                self.refresh_changes()
 
     def edit_artefact(self):
-        row = self.table.currentRow()
-        if row < 0:
+        artefact_id = self.selected_artefact_id()
+        if artefact_id is None:
             QMessageBox.warning(self, "გაფრთხილება", "აირჩიეთ არტეფაქტი რედაქტირებისთვის.")
             return
 
-        artefact_id = int(self.table.item(row, 0).text())
-
         # Fetch full artefact row
-        conn = sqlite3.connect(database.DB_NAME)
-        cur = conn.cursor()
-        cur.execute("""SELECT * FROM artefacts WHERE id=?""", (artefact_id,))
-        artefact = cur.fetchone()
-        conn.close()
+        artefact = database.get_artefact_by_id(artefact_id)
 
-        # Open form (form itself preloads images via get_images(artefact[0]))
+        # Open form (form itself preloads images via get_images_with_names(artefact.id))
         dialog = ArtefactForm(artefact)
         if dialog.exec_():
-            updated = list(dialog.get_data())
-            new_images = updated.pop()   # list of image paths returned by the form
+            # Images the form dropped lose their DB row only; files stay until photo_gc runs
+            updated, images = dialog.get_data()
+            if self.save_artefact(updated, images) is not None:
+                self.refresh_changes()
+
+    def bulk_edit_artefacts(self):
+        artefact_ids = self.selected_artefact_ids()
+        if not artefact_ids:
+            QMessageBox.warning(self, "გაფრთხილება", "აირჩიეთ არტეფაქტები რედაქტირებისთვის.")
+            return
 
-            artefact_code = updated[0]
-            if not artefact_code.strip():
-                QMessageBox.warning(self, "გაფრთხილება", "გთხოვთ შეიყვანოთ კოდი არტეფაქტისთვის.")
-                return
+        dialog = BulkEditDialog(len(artefact_ids))
+        if dialog.exec_():
+            database.bulk_update_artefacts(artefact_ids, dialog.get_changes())
+            self.refresh_changes()
 
-            try:
-                database.update_artefact(artefact_id, updated)
-            except ValueError as e:
-                QMessageBox.warning(self, "შეცდომა", str(e))
-                return
+    def save_artefact(self, artefact, images):
+        """
+        Save the form's fields and photos in one transaction
+        (database.save_artefact), showing progress while several photos
+        are processed. Returns the artefact id, or None after a warning.
+        """
+        if not artefact.artefact_code.strip():
+            QMessageBox.warning(self, "გაფრთხილება", "გთხოვთ შეიყვანოთ კოდი არტეფაქტისთვის.")
+            return None
 
-            # --- Sync images (safe: do NOT delete files automatically) ---
-            # old_images: absolute paths currently referenced by DB
-            old_images = database.get_images(artefact_id)  # returns full paths
-            # new_images: absolute paths shown in the form (mix of PHOTOS_DIR paths for existing,
-            # and original source paths for newly chosen files)
-            old_filenames = {os.path.basename(p) for p in old_images}
-            new_filenames = {os.path.basename(p) for p in new_images}
-
-            # 1) Remove DB references for images user removed in the form (do NOT delete files)
-            removed_filenames = old_filenames - new_filenames
-            if removed_filenames:
-                conn = sqlite3.connect(database.DB_NAME)
-                cur = conn.cursor()
-                for fn in removed_filenames:
-                    cur.execute(
-                        "DELETE FROM artefact_images WHERE artefact_id=? AND image_path=?",
-                        (artefact_id, fn)
-                    )
-                conn.commit()
-                conn.close()
-
-            # 2) Add newly added images (copy/compress them into PHOTOS_DIR via database.add_image)
-            #    (only add those whose basename wasn't already present in DB)
-            added_paths = [p for p in new_images if os.path.basename(p) not in old_filenames]
-            for src_path in added_paths:
-                # sanity: only add if file exists
-                if os.path.exists(src_path):
-                    database.add_image(artefact_id, src_path)
-                else:
-                    # If the path isn't present on disk, try to see if it's already in PHOTOS_DIR
-                    candidate = os.path.join(database.PHOTOS_DIR, os.path.basename(src_path))
-                    if os.path.exists(candidate):
-                        # insert DB reference for existing photo file (no copy)
-                        conn = sqlite3.connect(database.DB_NAME)
-                        cur = conn.cursor()
-                        cur.execute(
-                            "INSERT INTO artefact_images (artefact_id, image_path) VALUES (?, ?)",
-                            (artefact_id, os.path.basename(candidate))
-                        )
-                        conn.commit()
-                        conn.close()
-                    else:
-                        # file missing — warn in console (don't crash the app)
-                        print(f"⚠ Skipping missing image: {src_path}")
-
-            # 3) Finished — refresh UI
-            self.load_data()
+        dialog = None
+
+        def progress(done, total):
+            nonlocal dialog
+            if total < 2:
+                return
+            if dialog is None:
+                dialog = QProgressDialog("ფოტოების დამუშავება...", None, 0, total, self)
+                dialog.setWindowTitle("ფოტოები")
+                dialog.setWindowModality(Qt.WindowModal)
+                dialog.setMinimumDuration(0)
+            dialog.setValue(done)
+            QApplication.processEvents()
 
+        try:
+            return database.save_artefact(artefact, images, progress=progress)
+        except ValueError as e:
+            QMessageBox.warning(self, "გაფრთხილება", str(e))
+            return None
+        finally:
+            if dialog is not None:
+                dialog.close()
 
     def delete_artefact(self):
-        row = self.table.currentRow()
-        if row < 0:
+        artefact_id = self.selected_artefact_id()
+        if artefact_id is None:
             QMessageBox.warning(self, "გაფრთხილება", "აირჩიეთ წასაშლელი არტეფაქტი.")
             return
-
-        artefact_id = int(self.table.item(row, 0).text())
         reply = QMessageBox.question(
             self, "წაშლის დადასტურება", "დარწმუნებული ხართ რომ გინდათ არტეფაქტის წაშლა?",
             QMessageBox.Yes | QMessageBox.No
@@ -288,54 +285,32 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.Yes:
             database.delete_artefact(artefact_id)
-            self.load_data()
+            self.refresh_changes()
 
     # ---------------- Filters ----------------
-    def apply_filters(self):
+    def current_sort(self):
+        """(column name, descending) picked with the table header."""
+        header = self.table.horizontalHeader()
+        section = header.sortIndicatorSection()
+        # The photo column has nothing to sort by; fall back to id
+        sort = database.ARTEFACT_COLUMNS[section] if 0 <= section < PHOTO_COLUMN else "id"
+        return sort, header.sortIndicatorOrder() == Qt.DescendingOrder
+
+    def apply_filters(self, immediate=False):
+        """Queue a search for the current filters; typing is debounced, combo changes are not."""
         search_text = self.search_input.text().lower()
         selected_category = self.category_filter.currentText()
         selected_status = self.status_filter.currentText()
-
-        artefacts = database.get_artefacts()
-        filtered = []
-
-        for artefact in artefacts:
-            searchable_text = " ".join(str(x).lower() for x in artefact[1:])
-            if search_text and search_text not in searchable_text:
-                continue
-            if selected_category != "ყველა კატეგორია" and artefact[3] != selected_category:
-                continue
-            if selected_status != "ყველა სტატუსი" and artefact[9] != selected_status:
-                continue
-            filtered.append(artefact)
-
-        self.table.setRowCount(0)
-        
-        for row_idx, artefact in enumerate(filtered):
-            self.table.insertRow(row_idx)
-            for col_idx, value in enumerate(artefact):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)  # read-only
-                self.table.setItem(row_idx, col_idx, item)
-
-
-            # Image preview
-            images = get_images(artefact[0])
-            if images and os.path.exists(images[0]):
-                pixmap = QPixmap(images[0]).scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                label = QLabel()
-                label.setPixmap(pixmap)
-                label.setAlignment(Qt.AlignCenter)
-                self.table.setCellWidget(row_idx, 12, label)
-                self.table.setRowHeight(row_idx, 160)
-            else:
-                placeholder = QPixmap("assets/placeholder.png").scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                label = QLabel()
-                label.setPixmap(placeholder)
-                label.setAlignment(Qt.AlignCenter)
-                self.table.setCellWidget(row_idx, 12, label)
-                self.table.setRowHeight(row_idx, 160)
-
+        sort, descending = self.current_sort()
+
+        self.query_engine.submit(
+            search_text,
+            category=selected_category if selected_category != "ყველა კატეგორია" else None,
+            status=selected_status if selected_status != "ყველა სტატუსი" else None,
+            sort=sort,
+            descending=descending,
+            immediate=immediate,
+        )
 
     def clear_filters(self):
         self.search_input.clear()
@@ -344,9 +319,9 @@ class MainWindow(QMainWindow):
         self.load_data()
 
     # ---------------- Other features ----------------
-    def open_gallery(self, row, column):
-        if column == 12:
-            artefact_id = int(self.table.item(row, 0).text())
+    def open_gallery(self, index):
+        if index.column() == PHOTO_COLUMN:
+            artefact_id = self.model.artefact_id(index.row())
             gallery = ImageGallery(artefact_id)
             gallery.exec_()
 
@@ -368,6 +343,10 @@ class MainWindow(QMainWindow):
                 app = QApplication.instance()
                 app.main_window = new_window
 
+    def closeEvent(self, event):
+        self.query_engine.shutdown()
+        super().closeEvent(event)
+
     def backup_data(self):
         try:
             backup_database_and_photos()
@@ -375,6 +354,18 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "შეცდომა", str(e))
 
+    def cleanup_photos(self):
+        """Move photos no artefact references to trash; purge expired trash in the background."""
+        try:
+            count, size = collect_garbage()
+            purge_trash_in_background()
+            QMessageBox.information(
+                self, "ფოტოების გასუფთავება",
+                f"გადატანილია სანაგვეში: {count} ფაილი ({size / 1024 / 1024:.1f} MB)."
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "შეცდომა", str(e))
+
     def sync_data(self):
         """
         Full sync from Google Drive, overwriting all local files.
@@ -420,31 +411,73 @@ class MainWindow(QMainWindow):
             return "\n".join(lines)
 
         labels = [wrap_label(t) for t in raw]
-        self.table.setHorizontalHeaderLabels(labels)
+        self.model.set_header_labels(labels)
         header = self.table.horizontalHeader()
         header.setDefaultAlignment(Qt.AlignCenter)
         header.setSectionResizeMode(QHeaderView.Stretch)
         header.setFixedHeight(60)
 
+    def export_filters(self):
+        """The query behind the table (filters and sort), as exporter arguments."""
+        text, category, status, sort, descending = self.model.query()
+        return {"text": text, "category": category, "status": status,
+                "sort": sort, "descending": descending}
+
     def export_excel(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Excel", "", "Excel Files (*.xlsx)")
         if path:
-            export_to_excel(path)
+            export_to_excel(path, **self.export_filters())
             QMessageBox.information(self, "ექსპორტი", f"✅ ექსპორტი წარმატებით განხორციელდა {path}")
 
     def export_pdf(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save PDF", "", "PDF Files (*.pdf)")
         if path:
-            export_to_pdf(path)
+            export_to_pdf(path, **self.export_filters())
             QMessageBox.information(self, "ექსპორტი", f"✅ PDF ექსპორტი წარმატებით განხორციელდა {path}")
 
 
+    def import_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import", "", "Spreadsheets (*.xlsx *.csv)")
+        if not path:
+            return
+        # Optional: photos named after the codes (CODE.jpg, CODE_1.jpg, ...)
+        photos_dir = QFileDialog.getExistingDirectory(self, "ფოტოების საქაღალდე (არასავალდებულო)")
+
+        dialog = QProgressDialog("იმპორტი...", None, 0, 0, self)
+        dialog.setWindowTitle("იმპორტი")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+        labels = {"rows": "ჩანაწერები", "photos": "ფოტოები"}
+
+        def progress(stage, done, total):
+            dialog.setLabelText(f"{labels[stage]}: {done}")
+            dialog.setMaximum(total)
+            dialog.setValue(done)
+            QApplication.processEvents()
+
+        try:
+            inserted, skipped, photos = import_artefacts(path, photos_dir or None, progress=progress)
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "შეცდომა", str(e))
+            return
+        finally:
+            dialog.close()
+
+        # Thousands of rows: a fresh query beats replaying them from the change log
+        self.load_data()
+        message = f"✅ დაემატა {inserted} არტეფაქტი, {photos} ფოტო."
+        if skipped:
+            message += f"\nგამოტოვებულია {len(skipped)} (ცარიელი ან არსებული კოდი)."
+        QMessageBox.information(self, "იმპორტი", message)
+
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # photo ingestion pool in the packaged .exe
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("assets/GEM_logo.png"))
 
     database.init_db()
+    database.migrate_photo_layout_in_background()
     init_users_table()
 
     if not users_exist():
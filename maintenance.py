@@ -0,0 +1,92 @@
+"""
+Headless maintenance commands for the GEM photo store and database.
+
+    python maintenance.py backfill-thumbnails [--workers N]
+    python maintenance.py collect-garbage [--dry-run] [--retention-days N]
+    python maintenance.py migrate-layout
+    python maintenance.py import FILE [--photos DIR]
+    python maintenance.py export FILE.csv|.ndjson|.parquet [--photos] [--category C] [--status S]
+"""
+import argparse
+import multiprocessing
+
+import database
+import photo_gc
+
+
+def backfill_thumbnails(args):
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", flush=True)
+
+    count = database.backfill_thumbnails(workers=args.workers, progress=progress)
+    print(f"\n✅ Thumbnails generated for {count} photos.")
+
+
+def migrate_layout(args):
+    moved = database.migrate_photo_layout(progress=lambda n: print(f"\r{n}", end="", flush=True))
+    print(f"\n✅ {moved} files moved into the sharded photo layout.")
+
+
+def collect_garbage(args):
+    count, size = photo_gc.collect_garbage(dry_run=args.dry_run)
+    action = "would be moved" if args.dry_run else "moved"
+    print(f"✅ {count} orphaned files ({size / 1024 / 1024:.1f} MB) {action} to trash.")
+    if not args.dry_run:
+        freed = photo_gc.purge_trash(args.retention_days)
+        print(f"✅ {freed / 1024 / 1024:.1f} MB of expired trash purged.")
+
+
+def import_file(args):
+    # Imported lazily: the exporter it shares headers with loads reportlab
+    from importer import import_artefacts
+
+    def progress(stage, done, total):
+        print(f"\r{stage}: {done}" + (f"/{total}" if total else ""), end="", flush=True)
+
+    inserted, skipped, photos = import_artefacts(args.file, args.photos, progress=progress)
+    print(f"\n✅ {inserted} artefacts and {photos} photos imported, {len(skipped)} rows skipped.")
+
+
+def export_file(args):
+    from bulk_export import export_artefacts
+
+    export_artefacts(args.file, photos=args.photos, category=args.category, status=args.status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GEM maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-thumbnails", help="create missing photo derivatives")
+    backfill.add_argument("--workers", type=int, default=None, help="processes to use (default: all cores)")
+    backfill.set_defaults(func=backfill_thumbnails)
+
+    gc = commands.add_parser("collect-garbage", help="move unreferenced photos to trash, purge old trash")
+    gc.add_argument("--dry-run", action="store_true", help="only report what would be moved")
+    gc.add_argument("--retention-days", type=int, default=photo_gc.TRASH_RETENTION_DAYS,
+                    help="delete trash batches older than this")
+    gc.set_defaults(func=collect_garbage)
+
+    layout = commands.add_parser("migrate-layout", help="move flat photos into hashed subfolders")
+    layout.set_defaults(func=migrate_layout)
+
+    imp = commands.add_parser("import", help="bulk-import artefacts from an .xlsx or .csv file")
+    imp.add_argument("file")
+    imp.add_argument("--photos", default=None, help="folder with photos named after the codes")
+    imp.set_defaults(func=import_file)
+
+    exp = commands.add_parser("export", help="dump artefacts as CSV, NDJSON or Parquet")
+    exp.add_argument("file")
+    exp.add_argument("--photos", action="store_true", help="add a column with each artefact's photo paths")
+    exp.add_argument("--category", default=None, help="only this category")
+    exp.add_argument("--status", default=None, help="only this status")
+    exp.set_defaults(func=export_file)
+
+    args = parser.parse_args()
+    database.init_db()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,113 @@
+import os
+import shutil
+import threading
+import time
+from database import DOCS_DIR, PHOTOS_DIR, THUMBS_DIR, get_connection
+
+# -------------------------
+# Photo garbage collection
+# -------------------------
+# Mark: every filename referenced by artefact_images.
+# Sweep: files under PHOTOS_DIR / THUMBS_DIR that nobody references are
+# moved into a dated TRASH_DIR batch, which is purged once it expires.
+
+TRASH_DIR = os.path.join(DOCS_DIR, "trash")
+
+# Trash batches older than this are deleted for good
+TRASH_RETENTION_DAYS = 30
+
+# Files younger than this are left alone: an ingest may have written the
+# file but not yet committed its artefact_images row
+GRACE_SECONDS = 3600
+
+BATCH_FORMAT = "%Y%m%d-%H%M%S"
+
+
+def referenced_filenames():
+    cur = get_connection().execute("SELECT DISTINCT image_path FROM artefact_images")
+    return {row[0] for row in cur.fetchall()}
+
+
+def find_orphans():
+    """Return [(path, size)] of photo and thumbnail files no DB row references."""
+    referenced = referenced_filenames()
+    cutoff = time.time() - GRACE_SECONDS
+    orphans = []
+
+    for top in (PHOTOS_DIR, THUMBS_DIR):
+        for root, _, files in os.walk(top):
+            for name in files:
+                if name in referenced:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue  # deleted under us
+                if st.st_mtime > cutoff:
+                    continue
+                orphans.append((path, st.st_size))
+    return orphans
+
+
+def collect_garbage(dry_run=False):
+    """
+    Move orphaned files into a new trash batch (nothing is deleted yet).
+    Returns (file count, bytes reclaimed once the batch is purged).
+    """
+    orphans = find_orphans()
+    if dry_run or not orphans:
+        return len(orphans), sum(size for _, size in orphans)
+
+    batch = os.path.join(TRASH_DIR, time.strftime(BATCH_FORMAT))
+    moved, reclaimed = 0, 0
+    for path, size in orphans:
+        # Keep the layout (photos/..., thumbs/150/...) so a batch can be restored by hand
+        dest = os.path.join(batch, os.path.relpath(path, DOCS_DIR))
+        try:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(path, dest)
+        except OSError as e:
+            print(f"⚠ Could not move {path} to trash: {e}")
+            continue
+        moved += 1
+        reclaimed += size
+
+    print(f"🗑 Moved {moved} orphaned files ({reclaimed / 1024 / 1024:.1f} MB) to {batch}")
+    return moved, reclaimed
+
+
+def purge_trash(retention_days=TRASH_RETENTION_DAYS):
+    """Delete trash batches older than retention_days. Returns bytes freed."""
+    if not os.path.isdir(TRASH_DIR):
+        return 0
+
+    cutoff = time.time() - retention_days * 86400
+    freed = 0
+    for name in os.listdir(TRASH_DIR):
+        batch = os.path.join(TRASH_DIR, name)
+        try:
+            created = time.mktime(time.strptime(name, BATCH_FORMAT))
+        except ValueError:
+            continue  # not ours
+        if created > cutoff:
+            continue
+
+        for root, _, files in os.walk(batch):
+            for f in files:
+                try:
+                    freed += os.path.getsize(os.path.join(root, f))
+                except OSError:
+                    pass
+        shutil.rmtree(batch, ignore_errors=True)
+
+    if freed:
+        print(f"🗑 Purged {freed / 1024 / 1024:.1f} MB of expired trash")
+    return freed
+
+
+def purge_trash_in_background(retention_days=TRASH_RETENTION_DAYS):
+    """Run purge_trash on a daemon thread so the UI never waits for it."""
+    thread = threading.Thread(target=purge_trash, args=(retention_days,), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+import database
+
+# -------------------------
+# Search query engine
+# -------------------------
+# Sits between the search bar / filter combos and the table model:
+# - typing is debounced, so a burst of keystrokes runs one query
+# - queries run on a worker thread, on a connection from the engine's own
+#   pool, and a superseded one is interrupted; its late result is dropped
+# - recent (text, category, status, sort, descending) -> id lists are kept
+#   in an LRU cache
+# - when the text only grew, the previous result is narrowed instead of
+#   searching the whole table again
+# Every result carries the change_log seq it reflects, so the receiver can
+# catch up with database.changes_since() however old the result is.
+
+# Milliseconds of typing silence before a query runs
+DEBOUNCE_MS = 250
+
+# Number of recent results kept
+CACHE_SIZE = 32
+
+# Narrowing passes the earlier result to SQL as a JSON list of ids; above
+# this many rows searching the whole table is the faster way
+NARROW_MAX_IDS = 5000
+
+
+class _QuerySignals(QObject):
+    finished = pyqtSignal(int, object, object, int)   # generation, query, ids, seq
+
+
+class _QueryTask(QRunnable):
+    """Run one search on a pool thread."""
+
+    def __init__(self, generation, query, base, signals, connections):
+        super().__init__()
+        self.setAutoDelete(False)  # QueryEngine keeps the reference
+        self.generation = generation
+        self.query = query
+        self.base = base  # (seq, ids) to narrow, or None
+        self.signals = signals
+        self.connections = connections  # database.ConnectionPool
+        self.cancelled = False
+        self._conn = None
+        self._conn_lock = threading.Lock()  # cancel() never interrupts a connection already given back
+
+    def run(self):
+        if self.cancelled:
+            return
+        text, category, status, sort, descending = self.query
+        # Not get_connection(): this thread's local state (and the
+        # connection in it) would be torn down after every run
+        conn = self.connections.acquire()
+        with self._conn_lock:
+            self._conn = conn
+        try:
+            if self.base:
+                # Only as fresh as the result it narrows
+                seq = self.base[0]
+                ids = database.search_ids(text, category, status, within=self.base[1],
+                                          sort=sort, descending=descending, conn=conn)
+            else:
+                seq = database.latest_change_seq(conn)
+                ids = database.search_ids(text, category, status, sort=sort, descending=descending, conn=conn)
+        except sqlite3.OperationalError:
+            if self.cancelled:
+                return  # interrupted by cancel()
+            raise
+        finally:
+            with self._conn_lock:
+                self._conn = None
+            self.connections.release(conn)
+        if not self.cancelled:
+            self.signals.finished.emit(self.generation, self.query, ids, seq)
+
+    def cancel(self):
+        self.cancelled = True
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.interrupt()  # thread-safe: aborts the running statement
+
+
+class QueryEngine(QObject):
+    """
+    Call submit() whenever the filters change; results_ready(query, ids, seq)
+    fires on the GUI thread for the latest query only. seq is the change_log
+    position the ids reflect.
+    """
+
+    results_ready = pyqtSignal(object, object, int)   # (text, category, status, sort, descending), [id, ...], seq
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)  # the running query plus one being cancelled
+        self._pool.setExpiryTimeout(-1)  # keep the threads between searches
+        self._connections = database.ConnectionPool()  # reused by every task until shutdown()
+        self._signals = _QuerySignals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run_pending)
+        self._cache = OrderedDict()
+        self._pending = None
+        self._task = None
+        self._generation = 0
+
+    def submit(self, text="", category=None, status=None, sort="id", descending=False, immediate=False):
+        """Queue a query; it runs after DEBOUNCE_MS of quiet unless immediate."""
+        self._pending = (text, category, status, sort, descending)
+        self._timer.start(0 if immediate else DEBOUNCE_MS)
+
+    def invalidate(self):
+        """Forget cached results (call after the artefacts table changed)."""
+        self._cache.clear()
+
+    def cancel(self):
+        """Drop the pending query and interrupt the running one."""
+        self._timer.stop()
+        self._pending = None
+        self._generation += 1
+        if self._task is not None:
+            self._task.cancel()
+            self._pool.tryTake(self._task)
+            self._task = None
+
+    def shutdown(self):
+        """Cancel, wait for the worker threads and close the engine's connections."""
+        self.cancel()
+        self._pool.waitForDone()
+        self._connections.close()
+
+    def _run_pending(self):
+        query, self._pending = self._pending, None
+        if query is None:
+            return
+        self.cancel()
+
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._cache.move_to_end(query)
+            self.results_ready.emit(query, cached[1], cached[0])
+            return
+
+        self._task = _QueryTask(self._generation, query, self._narrowing_base(query), self._signals,
+                                self._connections)
+        self._pool.start(self._task)
+
+    def _narrowing_base(self, query):
+        """The cached (seq, ids) for the longest shorter prefix of query's text, if small enough."""
+        text, *rest = query
+        for end in range(len(text) - 1, 0, -1):
+            cached = self._cache.get((text[:end], *rest))
+            if cached is not None:
+                return cached if len(cached[1]) <= NARROW_MAX_IDS else None
+        return None
+
+    def _on_finished(self, generation, query, ids, seq):
+        if generation != self._generation:
+            return  # superseded while running
+        self._task = None
+        self._cache[query] = (seq, ids)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        self.results_ready.emit(query, ids, seq)
@@ -0,0 +1,50 @@
+"""
+Tests run against a scratch collection in a temp folder (never the real
+C:\\GEM DATABASE) on the offscreen Qt platform, from the repository root,
+where the exporter finds its fonts.
+"""
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+os.chdir(REPO_DIR)
+os.environ["GEM_DATA_DIR"] = tempfile.mkdtemp(prefix="gem_test_")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import database  # noqa: E402  (must follow GEM_DATA_DIR)
+
+LOCATIONS = ["საცავი", "ვიტრინა", "დარბაზი", "ლაბორატორია", None]
+CURATORS = ["ნინო", "გიორგი", "თამარ", "დავით", ""]
+
+
+@pytest.fixture(scope="session")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def collection():
+    """An empty collection; returns seed(count), which adds count varied artefacts."""
+    database.init_db()
+    with database.transaction() as cur:
+        cur.execute("DELETE FROM artefacts")
+
+    def seed(count):
+        rnd = random.Random(count)
+        with database.transaction() as cur:
+            cur.executemany(
+                """INSERT INTO artefacts (artefact_code, name, category, location, status, curator)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                ((f"T-{i:05d}", f"ნივთი {i}", rnd.choice(database.CATEGORIES), rnd.choice(LOCATIONS),
+                  rnd.choice(database.STATUS_OPTIONS), rnd.choice(CURATORS))
+                 for i in range(count)),
+            )
+        return [row[0] for row in database.get_connection().execute("SELECT id FROM artefacts ORDER BY id")]
+
+    return seed
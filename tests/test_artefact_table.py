@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+import database
+from artefact_table import ArtefactTableModel
+
+
+def model_order(model):
+    """The model's full result order, checking the fetched rows agree with it."""
+    ids = list(model._ids)
+    assert [model.artefact_id(row) for row in range(model.rowCount())] == ids[:model.rowCount()]
+    return ids
+
+
+@pytest.mark.parametrize("sort", ["location", "curator", "status", "id"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_refresh_rows_keeps_sort_order_after_many_changes(app, collection, sort, descending):
+    ids = collection(3000)
+    model = ArtefactTableModel()
+    model.set_query(sort=sort, descending=descending)
+    model.fetchMore()  # some rows fetched, most not
+
+    rnd = random.Random(sort)
+    changed = rnd.sample(ids, 400)
+    database.bulk_update_artefacts(changed[:300], {"location": "ვიტრინა", "curator": "ნინო",
+                                                   "status": database.STATUS_OPTIONS[0]})
+    with database.transaction() as cur:
+        cur.executemany("UPDATE artefacts SET location=?, curator=? WHERE id=?",
+                        ((rnd.choice(["ა", "ჰ", None]), rnd.choice(["ა", "ჰ", ""]), i) for i in changed[300:350]))
+        cur.executemany("DELETE FROM artefacts WHERE id=?", ((i,) for i in changed[350:]))
+    model.refresh_rows(changed)
+
+    assert model_order(model) == database.search_ids(sort=sort, descending=descending)
+
+
+def test_refresh_rows_adds_new_artefacts_in_place(app, collection):
+    collection(500)
+    model = ArtefactTableModel()
+    model.set_query(sort="location")
+    new_ids = [database.add_artefact((f"N-{i}", "ახალი", "", "", "", "", loc, "", "", ""))
+               for i, loc in enumerate(["ა", "ჰ", "საცავი", ""])]
+    model.refresh_rows(new_ids)
+
+    assert model_order(model) == database.search_ids(sort="location")
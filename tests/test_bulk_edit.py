@@ -0,0 +1,44 @@
+import random
+
+import pytest
+from PyQt5.QtCore import Qt
+
+import database
+import main
+
+
+class FakeBulkEditDialog:
+    changes = {}
+
+    def __init__(self, count):
+        pass
+
+    def exec_(self):
+        return True
+
+    def get_changes(self):
+        return self.changes
+
+
+@pytest.mark.parametrize("column", ["location", "status", "curator"])
+@pytest.mark.parametrize("order", [Qt.AscendingOrder, Qt.DescendingOrder])
+def test_bulk_edit_of_the_sort_column_keeps_table_sorted(app, collection, monkeypatch, column, order):
+    ids = collection(3000)
+    window = main.MainWindow("admin", "admin")
+    window.table.horizontalHeader().setSortIndicator(database.ARTEFACT_COLUMNS.index(column), order)
+    window.load_data()
+    sort, descending = window.current_sort()
+    assert sort == column
+
+    selected = random.Random(column).sample(ids, 400)
+    value = {"status": database.STATUS_OPTIONS[1]}.get(column, "ვიტრინა")
+    monkeypatch.setattr(window, "selected_artefact_ids", lambda: selected)
+    monkeypatch.setattr(FakeBulkEditDialog, "changes", {column: value})
+    monkeypatch.setattr(main, "BulkEditDialog", FakeBulkEditDialog)
+    window.bulk_edit_artefacts()
+
+    model = window.model
+    shown = [model.artefact_id(row) for row in range(model.rowCount())]
+    assert list(model._ids) == database.search_ids(sort=sort, descending=descending)
+    assert shown == list(model._ids)[:len(shown)]
+    window.close()
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import database
+
+
+def open_db_files():
+    """File descriptors this process holds on DB_NAME (and its -wal/-shm)."""
+    fd_dir = "/proc/self/fd"
+    if not os.path.isdir(fd_dir):
+        pytest.skip("needs /proc")
+    count = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            count += os.readlink(os.path.join(fd_dir, fd)).startswith(database.DB_NAME)
+        except OSError:
+            pass
+    return count
+
+
+def test_connection_is_closed_when_its_thread_ends(collection):
+    collection(10)
+    opened = []
+
+    def worker():
+        conn = database.get_connection()
+        conn.execute("SELECT COUNT(*) FROM artefacts").fetchone()
+        opened.append(conn)
+
+    def run_threads(count):
+        for _ in range(count):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+    # SQLite may keep one closed descriptor for reuse while another
+    # connection holds locks on the file, so count after the first thread
+    run_threads(1)
+    before = open_db_files()
+    run_threads(10)
+
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert open_db_files() <= before
+
+
+def test_close_connections_reconnects_every_thread(collection):
+    collection(10)
+    conn = database.get_connection()
+    database.close_connections()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert database.get_connection().execute("SELECT COUNT(*) FROM artefacts").fetchone()[0] == 10
+
+
+def test_connection_pool_reuses_connections_until_closed(collection):
+    collection(10)
+    pool = database.ConnectionPool()
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+    database.close_connections()  # while conn is lent out
+    pool.release(conn)
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+    idle = pool.acquire()
+    assert idle is not conn
+    pool.release(idle)
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        idle.execute("SELECT 1")
+
+
+def test_narrowed_search_matches_like_a_full_search(collection):
+    collection(10)
+    artefact_id = database.add_artefact(("M-1", "Музей Ábside", "", "", "", "", "", "", "", ""))
+    assert database.search_ids("музей") == [artefact_id]
+    for text in ("музей", "ábside", "ÁBSIDE", "му"):
+        found = database.search_ids(text)
+        assert found == database.search_ids(text, within=found + [artefact_id])
+
+
+def test_search_folds_case_like_str_lower(collection):
+    collection(0)
+    mtavruli = database.add_artefact(("G-1", "ᲡᲐᲥᲐᲠᲗᲕᲔᲚᲝ", "", "", "", "", "", "", "", ""))
+    cyrillic = database.add_artefact(("R-1", "", "", "", "ЯЩИК ДЛЯ МОНЕТ", "", "", "", "", ""))
+    assert database.search_ids("საქართველო") == [mtavruli]
+    assert database.search_ids("ᲥᲐᲠᲗ") == [mtavruli]
+    assert database.search_ids("სა") == [mtavruli]      # under TRIGRAM_MIN_CHARS
+    assert database.search_ids("ящ") == [cyrillic]
+    assert database.search_ids("для мон") == [cyrillic]
+
+
+def test_search_index_follows_updates_and_deletes(collection):
+    collection(0)
+    artefact_id = database.add_artefact(("U-1", "ᲥᲕᲔᲕᲠᲘ", "", "", "", "", "", "", "", ""))
+    database.bulk_update_artefacts([artefact_id], {"name": "ДОКИ"})
+    assert database.search_ids("ქვევრი") == []
+    assert database.search_ids("доки") == [artefact_id]
+    database.delete_artefact(artefact_id)
+    assert database.search_ids("доки") == []
+
+
+def test_deferred_search_index_lowers_bulk_inserts(collection):
+    collection(0)
+    with database.transaction() as cur, database.deferred_search_index(cur):
+        cur.execute("INSERT INTO artefacts (artefact_code, name) VALUES ('B-1', 'ᲝᲥᲠᲝᲡ ᲑᲔᲭᲔᲓᲘ')")
+    assert len(database.search_ids("ოქროს ბეჭედი")) == 1
+
+
+def test_short_search_matches_every_occurrence(collection):
+    ids = collection(200)
+    database.add_artefact(("E-1", "ბოლო", "", "", "", "", "", "", "", "ზ"))    # last column
+    database.add_artefact(("E-2", "a\"b%", "", "", "", "", "", "", "", ""))
+    with database.transaction() as cur:
+        cur.execute("UPDATE artefacts SET description='ᲥᲕᲐ' WHERE id=?", (ids[0],))
+
+    rows = database.get_connection().execute(
+        f"SELECT id, {', '.join(database.SEARCH_COLUMNS)} FROM artefacts ORDER BY id").fetchall()
+    for text in ("ზ", "ქვ", "ო", "ლო", "1", "-0", "\"b", "%", "ყ"):
+        expected = [row[0] for row in rows if any(text in (value or "").lower() for value in row[1:])]
+        assert database.search_ids(text) == expected, text
+
+
+def test_other_programs_can_write_artefacts(collection):
+    ids = collection(20)
+    # A connection without the app's functions, like the sqlite3 shell
+    other = sqlite3.connect(database.DB_NAME, isolation_level=None)
+    other.execute("INSERT INTO artefacts (artefact_code, name) VALUES ('X-1', 'ᲥᲕᲔᲕᲠᲘ')")
+    other.execute("UPDATE artefacts SET name='ДОКИ' WHERE id=?", (ids[0],))
+    other.execute("DELETE FROM artefacts WHERE id=?", (ids[1],))
+    other.close()
+
+    def check():
+        assert len(database.search_ids("ქვევრი")) == 1
+        assert len(database.search_ids("ევ")) == 1
+        assert database.search_ids("доки") == [ids[0]]
+        assert database.search_ids("ნივთი 0") == []
+        assert ids[1] not in database.search_ids("ნი")
+
+    def pending():
+        return database.get_connection().execute("SELECT COUNT(*) FROM search_pending").fetchone()[0]
+
+    assert pending() == 3
+    check()  # queued ids are matched on their live values
+    database.init_db()
+    assert pending() == 0
+    check()
+
+
+def test_photo_path_needs_no_disk_access_once_sharded(collection, monkeypatch, tmp_path):
+    collection(0)
+    database.migrate_photo_layout()
+    assert os.path.exists(database.PHOTO_LAYOUT_MARKER)
+
+    def no_stat(path):
+        raise AssertionError(f"stat of {path}")
+
+    monkeypatch.setattr(database.os.path, "exists", no_stat)
+    path = database.photo_path("abc.jpg")
+    assert path == os.path.join(database.PHOTOS_DIR, database._shard("abc.jpg"), "abc.jpg")
+
+
+def test_get_thumbnail_falls_back_to_a_flat_photo(collection):
+    collection(0)
+    database.migrate_photo_layout()
+    flat = os.path.join(database.PHOTOS_DIR, "restored.jpg")
+    with open(flat, "wb") as f:
+        f.write(b"not really a jpeg")
+    try:
+        assert database.get_thumbnail(database.photo_path("restored.jpg"), 150) == flat
+    finally:
+        os.remove(flat)
+
+
+def test_only_the_collection_database_uses_wal(collection, tmp_path):
+    collection(0)
+    assert database.get_connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    users_db = str(tmp_path / "users.db")
+    legacy = sqlite3.connect(users_db)
+    legacy.execute("PRAGMA journal_mode=WAL")  # as an earlier build left it
+    legacy.close()
+
+    with database.transaction(users_db) as cur:
+        cur.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    conn = database.get_connection(users_db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert sorted(os.listdir(tmp_path)) == ["users.db"]
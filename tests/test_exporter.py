@@ -0,0 +1,86 @@
+import os
+import shutil
+import zipfile
+
+import openpyxl
+import pytest
+from pypdf import PdfReader
+
+import database
+import exporter
+
+
+def cache_files(kind):
+    directory = os.path.join(database.EXPORT_CACHE_DIR, kind)
+    return set(os.listdir(directory)) if os.path.isdir(directory) else set()
+
+
+@pytest.fixture
+def empty_cache():
+    shutil.rmtree(database.EXPORT_CACHE_DIR, ignore_errors=True)
+
+
+def sheet_rows(path):
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return [list(row) for row in wb.active.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+def test_excel_export_writes_every_row_in_order(collection, empty_cache, tmp_path):
+    collection(2500)
+    out = tmp_path / "all.xlsx"
+    exporter.export_to_excel(str(out), sort="location", descending=True)
+
+    rows = sheet_rows(out)
+    assert rows[0] == exporter.HEADERS
+    expected = [[str(v) if v else None for v in row]
+                for row in exporter.get_export_rows(sort="location", descending=True)]
+    assert rows[1:] == expected
+    # Full (non read-only) load too: the rows carry no r= references
+    assert openpyxl.load_workbook(out).active.max_row == 2501
+
+
+def test_excel_cache_reuses_blocks_around_a_change(collection, empty_cache, tmp_path):
+    ids = collection(5000)
+    out = str(tmp_path / "cached.xlsx")
+    exporter.export_to_excel(out, sort="name")
+    before = cache_files("xlsx")
+    assert len(before) > 3
+
+    database.delete_artefact(ids[4000])
+    database.bulk_update_artefacts([ids[2000]], {"curator": "სხვა კურატორი"})
+    database.add_artefact(("A-0", "ა პირველი", "", "", "", "", "", "", "", ""))  # sorts first by name
+    exporter.export_to_excel(out, sort="name")
+
+    # Only the blocks holding a change are rendered again
+    assert len(cache_files("xlsx") - before) <= 3
+    assert len(sheet_rows(out)) == 5001
+
+
+def test_pdf_cache_reuses_chunks_around_a_change(collection, empty_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "PDF_CHUNK_SIZE", 20)
+    ids = collection(300)
+    out = str(tmp_path / "catalogue.pdf")
+    exporter.export_to_pdf(out, workers=1)
+    before = cache_files("pdf")
+    assert len(before) > 3
+
+    database.delete_artefact(ids[5])
+    exporter.export_to_pdf(out, workers=1)
+
+    assert len(cache_files("pdf") - before) == 1
+    assert len(PdfReader(out).pages) >= 299 // 2
+
+
+def test_excel_keeps_leading_and_trailing_whitespace(collection, empty_cache, tmp_path):
+    collection(0)
+    database.add_artefact(("W-1", "ქვევრი", "", "", "  პირველი ხაზი\n  მეორე\n", "", "", "", "", ""))
+    out = tmp_path / "space.xlsx"
+    exporter.export_to_excel(str(out))
+
+    with zipfile.ZipFile(out) as xlsx:
+        sheet = xlsx.read(exporter.EXCEL_SHEET_PART).decode("utf-8")
+    assert '<t xml:space="preserve">  პირველი ხაზი\n  მეორე\n</t>' in sheet
+    assert "<t>ქვევრი</t>" in sheet
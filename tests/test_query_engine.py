@@ -0,0 +1,66 @@
+import sqlite3
+import time
+
+import pytest
+
+import database
+from query_engine import QueryEngine
+
+QUERIES = [
+    ("ნივთი 1", None, None, "id", False),
+    ("ნი", None, None, "id", False),
+    ("", database.CATEGORIES[1], None, "name", False),
+    ("ნივთი 12", None, database.STATUS_OPTIONS[0], "location", True),
+    ("ვიტრინა", None, None, "curator", False),
+]
+
+
+def run_query(app, engine, query, timeout=10):
+    """Submit query through the engine and pump events until its result arrives."""
+    results = []
+    engine.results_ready.connect(lambda *result: results.append(result))
+    engine.submit(*query, immediate=True)
+    deadline = time.monotonic() + timeout
+    while not results and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    engine.results_ready.disconnect()
+    assert results, f"no result for {query}"
+    return results[-1]
+
+
+def test_searches_through_the_event_loop(app, collection):
+    collection(5000)
+    engine = QueryEngine()
+    try:
+        for _ in range(3):
+            for query in QUERIES:
+                got_query, ids, seq = run_query(app, engine, query)
+                assert got_query == query
+                text, category, status, sort, descending = query
+                assert ids == database.search_ids(text, category, status, sort=sort, descending=descending)
+            engine.invalidate()
+    finally:
+        engine.shutdown()
+
+
+def test_searches_reuse_the_engine_connections(app, collection, monkeypatch):
+    collection(500)
+    opened = []
+    open_connection = database.open_connection
+
+    def counting_open_connection(*args):
+        opened.append(open_connection(*args))
+        return opened[-1]
+
+    monkeypatch.setattr(database, "open_connection", counting_open_connection)
+
+    engine = QueryEngine()
+    for query in QUERIES:
+        run_query(app, engine, query)
+    engine.shutdown()
+
+    assert 1 <= len(opened) <= 2  # one per pool thread at most
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -1,6 +1,7 @@
 import sqlite3
 import os
 import bcrypt
+from database import get_connection, transaction
 from PyQt5.QtWidgets import (
     QDialog, QFormLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QHeaderView, 
     QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QComboBox, QInputDialog
@@ -29,28 +30,21 @@ ROLE_REVERSE = {v: k for k, v in ROLE_TRANSLATIONS.items()}
 # Database functions
 # ----------------------
 def init_users_table():
-    conn = sqlite3.connect(USERS_DB)
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash BLOB NOT NULL,
-            role TEXT NOT NULL DEFAULT 'viewer',
-            created_at DATE DEFAULT (DATE('now'))
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(USERS_DB) as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash BLOB NOT NULL,
+                role TEXT NOT NULL DEFAULT 'viewer',
+                created_at DATE DEFAULT (DATE('now'))
+            )
+        """)
 
 
 def users_exist():
-    conn = sqlite3.connect(USERS_DB)
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM users")
-    count = cur.fetchone()[0]
-    conn.close()
-    return count > 0
+    cur = get_connection(USERS_DB).execute("SELECT COUNT(*) FROM users")
+    return cur.fetchone()[0] > 0
 
 
 def create_first_admin():
@@ -65,42 +59,30 @@ def create_first_admin():
 
 
 def add_user(username, password, role="viewer"):
-    conn = sqlite3.connect(USERS_DB)
-    cur = conn.cursor()
     password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
     try:
-        cur.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (username, password_hash, role))
-        conn.commit()
+        with transaction(USERS_DB) as cur:
+            cur.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                        (username, password_hash, role))
     except sqlite3.IntegrityError:
         QMessageBox.warning(None, "შეცდომა", f"მომხმარებელი '{username}' უკვე არსებობს.")
-    conn.close()
 
 
 def get_user(username):
-    conn = sqlite3.connect(USERS_DB)
-    cur = conn.cursor()
-    cur.execute("SELECT id, username, password_hash, role FROM users WHERE username=?", (username,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    cur = get_connection(USERS_DB).execute(
+        "SELECT id, username, password_hash, role FROM users WHERE username=?", (username,)
+    )
+    return cur.fetchone()
 
 
 def list_users():
-    conn = sqlite3.connect(USERS_DB)
-    cur = conn.cursor()
-    cur.execute("SELECT id, username, role, created_at FROM users ORDER BY id")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    cur = get_connection(USERS_DB).execute("SELECT id, username, role, created_at FROM users ORDER BY id")
+    return cur.fetchall()
 
 
 def delete_user(user_id):
-    conn = sqlite3.connect(USERS_DB)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM users WHERE id=?", (user_id,))
-    conn.commit()
-    conn.close()
+    with transaction(USERS_DB) as cur:
+        cur.execute("DELETE FROM users WHERE id=?", (user_id,))
 
 
 # ----------------------
@@ -277,11 +259,8 @@ class ManageUsersDialog(QDialog):
             return
 
         user_id = int(self.table.item(row, 0).text())
-        conn = sqlite3.connect(USERS_DB)
-        cur = conn.cursor()
-        cur.execute("SELECT role FROM users WHERE id=?", (user_id,))
+        cur = get_connection(USERS_DB).execute("SELECT role FROM users WHERE id=?", (user_id,))
         result = cur.fetchone()
-        conn.close()
         if not result:
             QMessageBox.warning(self, "შეცდომა", "მომხმარებელი ვერ მოიძებნა.")
             return
@@ -300,30 +279,21 @@ class ManageUsersDialog(QDialog):
 
             # Prevent demoting last admin
             if current_role == "admin" and new_role != "admin":
-                conn = sqlite3.connect(USERS_DB)
-                cur = conn.cursor()
-                cur.execute("SELECT COUNT(*) FROM users WHERE role='admin'")
+                cur = get_connection(USERS_DB).execute("SELECT COUNT(*) FROM users WHERE role='admin'")
                 admin_count = cur.fetchone()[0]
-                conn.close()
                 if admin_count <= 1:
                     QMessageBox.warning(self, "შეცდომა", "ვერ შეცვლით ბოლო ადმინისტრატორის როლს!")
                     return
 
-            conn = sqlite3.connect(USERS_DB)
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET role=? WHERE id=?", (new_role, user_id))
-            conn.commit()
-            conn.close()
+            with transaction(USERS_DB) as cur:
+                cur.execute("UPDATE users SET role=? WHERE id=?", (new_role, user_id))
 
         # Optional password reset
         reset, ok = QInputDialog.getText(self, "პაროლის განახლება", "ახალი პაროლი (დატოვე ცარიელი თუ არ გინდა შეცვლა):")
         if ok and reset.strip():
             password_hash = bcrypt.hashpw(reset.encode("utf-8"), bcrypt.gensalt())
-            conn = sqlite3.connect(USERS_DB)
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET password_hash=? WHERE id=?", (password_hash, user_id))
-            conn.commit()
-            conn.close()
+            with transaction(USERS_DB) as cur:
+                cur.execute("UPDATE users SET password_hash=? WHERE id=?", (password_hash, user_id))
             QMessageBox.information(self, "პაროლი განახლდა", "პაროლი წარმატებით შეიცვალა.")
 
         self.load_users()
@@ -335,26 +305,21 @@ class ManageUsersDialog(QDialog):
             return
 
         user_id = int(self.table.item(row, 0).text())
-        conn = sqlite3.connect(USERS_DB)
-        cur = conn.cursor()
-        cur.execute("SELECT role, username FROM users WHERE id=?", (user_id,))
+        conn = get_connection(USERS_DB)
+        cur = conn.execute("SELECT role, username FROM users WHERE id=?", (user_id,))
         result = cur.fetchone()
         if not result:
             QMessageBox.warning(self, "შეცდომა", "მომხმარებელი ვერ მოიძებნა.")
-            conn.close()
             return
         role, username = result
 
         if role == "admin":
-            cur.execute("SELECT COUNT(*) FROM users WHERE role='admin'")
+            cur = conn.execute("SELECT COUNT(*) FROM users WHERE role='admin'")
             admin_count = cur.fetchone()[0]
             if admin_count <= 1:
                 QMessageBox.warning(self, "შეცდომა", "ვერ წაშლით ბოლო ადმინისტრატორს!")
-                conn.close()
                 return
 
-        conn.close()
-
         reply = QMessageBox.question(
             self, "დადასტურება", f"დარწმუნებული ხართ რომ გინდათ მომხმარებლის ('{username}') წაშლა?",
             QMessageBox.Yes | QMessageBox.No